@@ -0,0 +1,41 @@
+import argparse
+
+from emotion_recognition.VideoFileAnalyzer import VideoFileAnalyzer
+from reports import DataStoreManager
+from reports.report_utils import generate_report
+from utils.Logger import Logger
+
+no_name = "No Name"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless emotion analysis of recorded interview videos")
+    parser.add_argument('videos', type=str, nargs='+')
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--interviewee', type=str, default=no_name)
+    parser.add_argument('--interviewer', type=str, default=no_name)
+    parser.add_argument('--no-report', action='store_true', help="Only analyze, do not save a report")
+    args = parser.parse_args()
+
+    logger = Logger()
+    data_store_manager = DataStoreManager()
+    analyzer = VideoFileAnalyzer(batch_size=args.batch_size)
+
+    for video in args.videos:
+        data_store_manager.set_interviewee_name(args.interviewee)
+        data_store_manager.set_interviewer_name(args.interviewer)
+
+        result = analyzer.analyze(video)
+        if result is None:
+            data_store_manager.clear()
+            continue
+
+        no_frames, elapsed_time, frames_per_second = result
+        print(f"{video}: {no_frames} frames, {elapsed_time:.2f}s, {frames_per_second:.2f} frames/sec, "
+              f"{len(data_store_manager.video_predictions)} video predictions")
+
+        if args.no_report:
+            data_store_manager.clear()
+        else:
+            generate_report()
+
+    logger.log_info("Video analysis finished")
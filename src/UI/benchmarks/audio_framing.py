@@ -0,0 +1,46 @@
+import argparse
+import timeit
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def legacy_frame(y, win_step=64, win_size=128):
+    # The loop VoiceEmotionPredictionThread._frame used before the strided view
+    nb_frames = 1 + int((y.shape[2] - win_size) / win_step)
+
+    frames = np.zeros((y.shape[0], nb_frames, y.shape[1], win_size)).astype(np.float16)
+    for t in range(nb_frames):
+        frames[:, t, :, :] = np.copy(y[:, :, (t * win_step):(t * win_step + win_size)]).astype(np.float16)
+
+    return frames
+
+
+def strided_frame(y, win_step=64, win_size=128):
+    # Same as VoiceEmotionPredictionThread._frame, copied so the benchmark does not need Qt or librosa
+    frames = sliding_window_view(y, win_size, axis=-1)[:, :, ::win_step, :]
+    return frames.transpose(0, 2, 1, 3)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Audio framing microbenchmark, the loop against the strided view")
+    parser.add_argument('--seconds', type=float, default=3.07, help="Length of the audio window")
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    signal = np.random.default_rng(0).standard_normal(int(args.seconds * 16000)).astype(np.float32)
+    no_chunks = 1 + (len(signal) - 49100) // 16000
+    mel_spect = np.random.default_rng(0).standard_normal((no_chunks, 128, 1 + len(signal) // 128)).astype(np.float32)
+
+    cases = [
+        ("chunks", lambda frame: frame(signal.reshape(1, 1, -1), 16000, 49100)),
+        ("mel frames", lambda frame: frame(mel_spect)),
+        # What the model gets: the mel frames as contiguous float32
+        ("mel frames + copy", lambda frame: np.ascontiguousarray(frame(mel_spect), dtype=np.float32))
+    ]
+    for name, case in cases:
+        legacy_time = timeit.timeit(lambda: case(legacy_frame), number=args.repeat) / args.repeat * 1000
+        strided_time = timeit.timeit(lambda: case(strided_frame), number=args.repeat) / args.repeat * 1000
+        difference = np.abs(case(legacy_frame).astype(np.float32) - case(strided_frame)).max()
+        print(f"{name:18} loop {legacy_time:8.3f} ms, strided {strided_time:8.3f} ms "
+              f"({legacy_time / strided_time:6.1f}x), max difference {difference:.4f} (float16 rounding)")
@@ -0,0 +1,32 @@
+import cv2
+
+
+def read_frames(source, max_frames=300):
+    capture = cv2.VideoCapture(int(source) if source.isdigit() else source)
+    frames = []
+    while len(frames) < max_frames:
+        is_read, frame = capture.read()
+        if not is_read:
+            break
+        frames.append(frame)
+    capture.release()
+    return frames
+
+
+def intersection_over_union(first, second):
+    left = max(first.left(), second.left())
+    top = max(first.top(), second.top())
+    right = min(first.right(), second.right())
+    bottom = min(first.bottom(), second.bottom())
+
+    intersection = max(0, right - left) * max(0, bottom - top)
+    union = first.width() * first.height() + second.width() * second.height() - intersection
+    return intersection / union if union > 0 else 0
+
+
+def count_matches(reference_rects, rects, min_iou=0.5):
+    matches = 0
+    for reference_rect in reference_rects:
+        if any(intersection_over_union(reference_rect, rect) >= min_iou for rect in rects):
+            matches += 1
+    return matches
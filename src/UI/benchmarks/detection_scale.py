@@ -0,0 +1,40 @@
+import argparse
+import time
+
+import cv2
+import dlib
+import numpy as np
+
+from benchmarks.benchmark_utils import read_frames, count_matches
+from detection.ScaledFaceDetector import ScaledFaceDetector
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Face detection time against miss rate for several detection scales")
+    parser.add_argument('source', type=str, help="Video file or camera index")
+    parser.add_argument('--scales', type=float, nargs='+', default=[1.0, 0.5, 0.33])
+    parser.add_argument('--max-frames', type=int, default=300)
+    args = parser.parse_args()
+
+    frames = [cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) for frame in read_frames(args.source, args.max_frames)]
+    if len(frames) == 0:
+        raise SystemExit(f"No frames could be read from {args.source}")
+
+    detector = dlib.get_frontal_face_detector()
+    # Full resolution detection is the reference for the miss rate
+    reference = [list(detector(frame, 0)) for frame in frames]
+    no_reference_faces = sum(len(rects) for rects in reference)
+
+    print(f"{len(frames)} frames of {frames[0].shape[1]}x{frames[0].shape[0]}, {no_reference_faces} reference faces")
+    for scale in args.scales:
+        scaled_detector = ScaledFaceDetector(detector, scale)
+        timings = []
+        matches = 0
+        for frame, reference_rects in zip(frames, reference):
+            start = time.perf_counter()
+            rects = scaled_detector(frame, 0)
+            timings.append((time.perf_counter() - start) * 1000)
+            matches += count_matches(reference_rects, rects)
+
+        miss_rate = 1 - matches / no_reference_faces if no_reference_faces > 0 else 0
+        print(f"scale {scale:.2f}: {np.mean(timings):.2f} ms/frame (p95 {np.percentile(timings, 95):.2f} ms), "
+              f"miss rate {miss_rate * 100:.1f}%")
@@ -0,0 +1,51 @@
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from benchmarks.benchmark_utils import read_frames, count_matches
+from detection import create_detector
+from detection.detection_utils import DETECTORS, HOG
+from detection.ScaledFaceDetector import ScaledFaceDetector
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time per frame and recall of the face detector backends")
+    parser.add_argument('source', type=str, help="Video file or camera index")
+    parser.add_argument('--detectors', type=str, nargs='+', default=DETECTORS, choices=DETECTORS)
+    parser.add_argument('--reference', type=str, default=HOG, choices=DETECTORS,
+                        help="Detector whose full resolution faces the recall is measured against")
+    parser.add_argument('--scale', type=float, default=1.0, help="Detection scale of the compared detectors")
+    parser.add_argument('--max-frames', type=int, default=300)
+    args = parser.parse_args()
+
+    frames = [cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) for frame in read_frames(args.source, args.max_frames)]
+    if len(frames) == 0:
+        raise SystemExit(f"No frames could be read from {args.source}")
+
+    reference_detector = create_detector(args.reference)
+    reference = [reference_detector(frame, 0) for frame in frames]
+    no_reference_faces = sum(len(rects) for rects in reference)
+
+    print(f"{len(frames)} frames of {frames[0].shape[1]}x{frames[0].shape[0]}, "
+          f"{no_reference_faces} {args.reference} reference faces")
+    for name in args.detectors:
+        try:
+            detector = ScaledFaceDetector(create_detector(name), args.scale)
+        except FileNotFoundError as ex:
+            print(f"{name}: skipped, {ex}")
+            continue
+
+        timings = []
+        matches = 0
+        no_faces = 0
+        for frame, reference_rects in zip(frames, reference):
+            start = time.perf_counter()
+            rects = detector(frame, 0)
+            timings.append((time.perf_counter() - start) * 1000)
+            matches += count_matches(reference_rects, rects)
+            no_faces += len(rects)
+
+        recall = matches / no_reference_faces if no_reference_faces > 0 else 0
+        print(f"{name:6} {np.mean(timings):7.2f} ms/frame (p95 {np.percentile(timings, 95):.2f} ms), "
+              f"recall {recall * 100:.1f}%, {no_faces / len(frames):.2f} faces/frame")
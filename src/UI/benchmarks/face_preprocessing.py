@@ -0,0 +1,43 @@
+import argparse
+import timeit
+
+import numpy as np
+from scipy.ndimage import zoom
+
+from emotion_recognition.FacePreprocessor import FacePreprocessor
+
+
+def legacy_preprocess_face(face, shape_x=48, shape_y=48):
+    # The per face path FaceDetectionThread used before FacePreprocessor
+    face = zoom(face, (shape_x / face.shape[0], shape_y / face.shape[1]))
+    face = face.astype(np.float32)
+    face /= float(face.max(initial=None))
+    return np.reshape(face.flatten(), (1, shape_x, shape_y, 1))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Face preprocessing microbenchmark")
+    parser.add_argument('--faces', type=int, default=1, help="Faces per frame")
+    parser.add_argument('--face-size', type=int, default=180, help="Side of the detected face crop in pixels")
+    parser.add_argument('--repeat', type=int, default=500)
+    args = parser.parse_args()
+
+    gray = np.random.randint(0, 256, (720, 1280), dtype=np.uint8)
+    boxes = [(index * args.face_size, 100, args.face_size, args.face_size) for index in range(args.faces)]
+    preprocessor = FacePreprocessor(max_faces=args.faces)
+
+    def legacy():
+        return np.concatenate([legacy_preprocess_face(gray[y:y + height, x:x + width])
+                               for x, y, width, height in boxes])
+
+    def preallocated():
+        return preprocessor.preprocess(gray, boxes)
+
+    legacy_time = timeit.timeit(legacy, number=args.repeat) / args.repeat * 1000
+    preallocated_time = timeit.timeit(preallocated, number=args.repeat) / args.repeat * 1000
+    difference = np.abs(legacy() - preallocated()).mean()
+
+    print(f"{args.faces} face(s) of {args.face_size}x{args.face_size}")
+    print(f"zoom + astype + reshape: {legacy_time:.3f} ms/frame")
+    print(f"FacePreprocessor:        {preallocated_time:.3f} ms/frame ({legacy_time / preallocated_time:.1f}x)")
+    print(f"mean absolute difference of the model input: {difference:.4f}")
@@ -0,0 +1,55 @@
+import argparse
+import time
+
+import numpy as np
+
+from inference import create_backend
+from inference.inference_utils import BACKENDS
+
+MODELS = {
+    'video': ('Models/video.h5', (48, 48, 1)),
+    'audio': ('Models/audio_v2.hdf5', (5, 128, 128, 1))
+}
+
+
+def measure(backend, x, repeat, warm_up=5):
+    for _ in range(warm_up):
+        backend.predict(x)
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        backend.predict(x)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CPU latency of the emotion models on every inference backend")
+    parser.add_argument('--backends', type=str, nargs='+', default=BACKENDS)
+    parser.add_argument('--models', type=str, nargs='+', default=list(MODELS))
+    parser.add_argument('--batch-size', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=100)
+    args = parser.parse_args()
+
+    for model_name in args.models:
+        model_path, input_shape = MODELS[model_name]
+        x = np.random.rand(args.batch_size, *input_shape).astype(np.float32)
+        reference = None
+
+        print(f"{model_name} model, batch of {args.batch_size}")
+        for backend_name in args.backends:
+            try:
+                backend = create_backend(backend_name, model_path)
+            except (ImportError, FileNotFoundError) as ex:
+                print(f"  {backend_name:12} unavailable: {ex}")
+                continue
+
+            timings = measure(backend, x, args.repeat)
+            prediction = backend.predict(x)
+            if reference is None:
+                reference = prediction
+            difference = np.abs(prediction - reference).max()
+
+            print(f"  {backend_name:12} {np.mean(timings):8.2f} ms (p50 {np.percentile(timings, 50):.2f}, "
+                  f"p95 {np.percentile(timings, 95):.2f}), max difference to {args.backends[0]}: {difference:.2e}")
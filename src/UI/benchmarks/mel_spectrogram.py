@@ -0,0 +1,47 @@
+import argparse
+import timeit
+
+import librosa
+import numpy as np
+from scipy.stats import zscore
+
+from emotion_recognition.MelSpectrogramExtractor import get_mel_extractor
+
+
+def legacy_mel_spectrogram(y, sr=16000, n_fft=512, win_length=256, hop_length=128, window='hamming', n_mels=128,
+                           fmax=4000):
+    # The per chunk librosa path VoiceEmotionPredictionThread used before MelSpectrogramExtractor
+    mel_spect = np.abs(librosa.stft(y, n_fft=n_fft, window=window, win_length=win_length, hop_length=hop_length)) ** 2
+    mel_spect = librosa.feature.melspectrogram(S=mel_spect, sr=sr, n_mels=n_mels, fmax=fmax)
+    return np.asarray(librosa.power_to_db(mel_spect, ref=np.max))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Log-mel spectrogram microbenchmark, librosa against the extractor")
+    parser.add_argument('--audio', type=str, default='', help="Audio file the chunks are taken from, noise if empty")
+    parser.add_argument('--chunks', type=int, default=3, help="Chunks of 49100 samples per call")
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    if args.audio:
+        signal, _ = librosa.load(args.audio, sr=16000)
+    else:
+        signal = np.random.default_rng(0).standard_normal(16000 * (args.chunks + 3)).astype(np.float32)
+    no_chunks = min(args.chunks, 1 + (len(signal) - 49100) // 16000)
+    chunks = np.stack([signal[index * 16000:index * 16000 + 49100] for index in range(no_chunks)])
+    extractor = get_mel_extractor()
+
+    def legacy():
+        return np.asarray([legacy_mel_spectrogram(chunk) for chunk in map(zscore, chunks)])
+
+    legacy_time = timeit.timeit(legacy, number=args.repeat) / args.repeat * 1000
+    extractor_time = timeit.timeit(lambda: extractor(chunks), number=args.repeat) / args.repeat * 1000
+    difference = np.abs(legacy() - extractor(chunks)).max()
+    print(f"{no_chunks} chunks: librosa {legacy_time:8.3f} ms, extractor {extractor_time:8.3f} ms "
+          f"({legacy_time / extractor_time:5.1f}x), max difference {difference:.2e} dB")
+
+    # librosa fails on silence, the extractor has to give finite features for it
+    silence = extractor(np.zeros((1, 49100), dtype=np.float32))
+    if not np.isfinite(silence).all():
+        raise SystemExit("Silence gives non finite log-mel features")
+    print("silence: finite log-mel features")
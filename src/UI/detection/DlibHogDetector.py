@@ -0,0 +1,11 @@
+import dlib
+
+from detection.FaceDetectorBackend import FaceDetectorBackend
+
+
+class DlibHogDetector(FaceDetectorBackend):
+    def __init__(self):
+        self._detector = dlib.get_frontal_face_detector()
+
+    def __call__(self, image, upsample_num_times=0):
+        return list(self._detector(image, upsample_num_times))
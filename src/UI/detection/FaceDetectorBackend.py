@@ -0,0 +1,12 @@
+from abc import ABC, abstractmethod
+
+
+class FaceDetectorBackend(ABC):
+    """Called like dlib's detector: (image, upsample_num_times) -> [dlib.rectangle,...].
+
+    The backends take gray images. Those without an upsampling step of their own ignore upsample_num_times.
+    """
+
+    @abstractmethod
+    def __call__(self, image, upsample_num_times=0):
+        pass
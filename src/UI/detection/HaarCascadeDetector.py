@@ -0,0 +1,22 @@
+import os
+
+import cv2
+import dlib
+
+from detection.FaceDetectorBackend import FaceDetectorBackend
+
+
+class HaarCascadeDetector(FaceDetectorBackend):
+    def __init__(self, model_path, scale_factor=1.1, min_neighbors=5, min_size=(30, 30)):
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"{model_path} not found")
+
+        self._classifier = cv2.CascadeClassifier(model_path)
+        self._scale_factor = scale_factor
+        self._min_neighbors = min_neighbors
+        self._min_size = min_size
+
+    def __call__(self, image, upsample_num_times=0):
+        boxes = self._classifier.detectMultiScale(image, scaleFactor=self._scale_factor,
+                                                  minNeighbors=self._min_neighbors, minSize=self._min_size)
+        return [dlib.rectangle(int(x), int(y), int(x + width), int(y + height)) for (x, y, width, height) in boxes]
@@ -0,0 +1,27 @@
+import cv2
+import dlib
+
+
+def scale_rectangle(rect, scale):
+    return dlib.rectangle(int(round(rect.left() * scale)), int(round(rect.top() * scale)),
+                          int(round(rect.right() * scale)), int(round(rect.bottom() * scale)))
+
+
+class ScaledFaceDetector:
+    """Runs a face detector on a downscaled copy of the image and maps the rectangles back to full resolution."""
+
+    def __init__(self, detector, scale=1.0):
+        self._detector = detector
+        self._scale = scale
+
+    @property
+    def scale(self):
+        return self._scale
+
+    def __call__(self, image, upsample_num_times=0):
+        if self._scale == 1.0:
+            return list(self._detector(image, upsample_num_times))
+
+        small_image = cv2.resize(image, None, fx=self._scale, fy=self._scale, interpolation=cv2.INTER_AREA)
+        rects = self._detector(small_image, upsample_num_times)
+        return [scale_rectangle(rect, 1 / self._scale) for rect in rects]
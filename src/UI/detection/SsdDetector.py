@@ -0,0 +1,36 @@
+import os
+
+import cv2
+import dlib
+import numpy as np
+
+from detection.FaceDetectorBackend import FaceDetectorBackend
+
+
+class SsdDetector(FaceDetectorBackend):
+    """OpenCV's ResNet-10 SSD face detector (Caffe), run through cv2.dnn on the CPU."""
+
+    def __init__(self, config_path, model_path, min_confidence=0.5, input_size=(300, 300)):
+        for path in (config_path, model_path):
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"{path} not found, copy deploy.prototxt and "
+                                        f"res10_300x300_ssd_iter_140000.caffemodel from OpenCV's "
+                                        f"samples/dnn/face_detector into Models")
+
+        self._net = cv2.dnn.readNetFromCaffe(config_path, model_path)
+        self._min_confidence = min_confidence
+        self._input_size = input_size
+
+    def __call__(self, image, upsample_num_times=0):
+        (height, width) = image.shape[:2]
+        if image.ndim == 2:
+            image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+
+        blob = cv2.dnn.blobFromImage(image, 1.0, self._input_size, (104.0, 177.0, 123.0))
+        self._net.setInput(blob)
+        detections = self._net.forward()[0, 0]  # (N, 7): _, _, confidence, left, top, right, bottom
+
+        detections = detections[detections[:, 2] >= self._min_confidence]
+        boxes = np.clip(detections[:, 3:7], 0, 1) * (width, height, width, height)
+        return [dlib.rectangle(int(left), int(top), int(right), int(bottom))
+                for (left, top, right, bottom) in boxes.round().astype(np.int64)]
@@ -0,0 +1,34 @@
+import os
+
+import cv2
+import dlib
+
+from detection.FaceDetectorBackend import FaceDetectorBackend
+
+
+class YuNetDetector(FaceDetectorBackend):
+    """OpenCV's YuNet face detector (ONNX), run through cv2.FaceDetectorYN."""
+
+    def __init__(self, model_path, min_confidence=0.6, nms_threshold=0.3):
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"{model_path} not found, copy the YuNet model from the OpenCV model zoo "
+                                    f"(models/face_detection_yunet) into Models")
+
+        self._detector = cv2.FaceDetectorYN.create(model_path, "", (320, 320), min_confidence, nms_threshold)
+        self._input_size = (320, 320)
+
+    def __call__(self, image, upsample_num_times=0):
+        (height, width) = image.shape[:2]
+        if image.ndim == 2:
+            image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+
+        if self._input_size != (width, height):
+            self._input_size = (width, height)
+            self._detector.setInputSize(self._input_size)
+
+        _, faces = self._detector.detect(image)
+        if faces is None:
+            return []
+        # faces: (N, 15): x, y, width, height, 5 landmarks, score
+        return [dlib.rectangle(int(x), int(y), int(x + face_width), int(y + face_height))
+                for (x, y, face_width, face_height) in faces[:, :4].round()]
@@ -0,0 +1,2 @@
+from .FaceDetectorBackend import FaceDetectorBackend
+from .detection_utils import create_detector
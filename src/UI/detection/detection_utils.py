@@ -0,0 +1,42 @@
+import numpy as np
+
+HOG = 'hog'
+HAAR = 'haar'
+SSD = 'ssd'
+YUNET = 'yunet'
+
+DETECTORS = [HOG, HAAR, SSD, YUNET]
+
+HAAR_MODEL = 'Models/haarcascade_frontalface_default.xml'
+SSD_CONFIG = 'Models/deploy.prototxt'
+SSD_MODEL = 'Models/res10_300x300_ssd_iter_140000.caffemodel'
+YUNET_MODEL = 'Models/face_detection_yunet_2023mar.onnx'
+
+
+def create_detector(name):
+    # Detectors are imported lazily, like the inference backends
+    if name == HOG:
+        from detection.DlibHogDetector import DlibHogDetector
+        return DlibHogDetector()
+    if name == HAAR:
+        from detection.HaarCascadeDetector import HaarCascadeDetector
+        return HaarCascadeDetector(HAAR_MODEL)
+    if name == SSD:
+        from detection.SsdDetector import SsdDetector
+        return SsdDetector(SSD_CONFIG, SSD_MODEL)
+    if name == YUNET:
+        from detection.YuNetDetector import YuNetDetector
+        return YuNetDetector(YUNET_MODEL)
+
+    raise ValueError(f"Unknown face detector {name}, expected one of {DETECTORS}")
+
+
+def shape_to_array(shape, dtype=np.int32):
+    # dlib full_object_detection -> (68, 2) array, in a single pass over the parts
+    parts = shape.parts()
+    return np.fromiter((coordinate for part in parts for coordinate in (part.x, part.y)), dtype=dtype,
+                       count=2 * len(parts)).reshape(-1, 2)
+
+
+def is_face_detected(face):
+    return face.shape[0] != 0 and face.shape[1] != 0
@@ -0,0 +1,61 @@
+import time
+import traceback
+from multiprocessing import shared_memory
+
+import dlib
+import numpy as np
+from imutils import face_utils
+
+from detection.ScaledFaceDetector import ScaledFaceDetector
+from detection.detection_utils import create_detector, shape_to_array
+
+NO_LANDMARKS = 68
+WORKER_FAILED = -1  # no_faces of the result a worker sends before it exits on an error
+
+
+class SharedDetectionBuffers:
+    """Views over one shared memory block holding the frame ring and the detection results of every slot."""
+
+    def __init__(self, memory, frame_shape, no_slots, max_faces):
+        frames_size = no_slots * frame_shape[0] * frame_shape[1]
+        boxes_size = no_slots * max_faces * 4 * 4
+
+        self.frames = np.ndarray((no_slots,) + frame_shape, dtype=np.uint8, buffer=memory.buf)
+        self.boxes = np.ndarray((no_slots, max_faces, 4), dtype=np.int32, buffer=memory.buf, offset=frames_size)
+        self.landmarks = np.ndarray((no_slots, max_faces, NO_LANDMARKS, 2), dtype=np.int32, buffer=memory.buf,
+                                    offset=frames_size + boxes_size)
+
+    @staticmethod
+    def size_of(frame_shape, no_slots, max_faces):
+        return no_slots * (frame_shape[0] * frame_shape[1] + max_faces * (4 + NO_LANDMARKS * 2) * 4)
+
+
+def detection_worker(memory_name, frame_shape, no_slots, max_faces, detector_name, detection_scale, landmarks_path,
+                     tasks, results):
+    memory = shared_memory.SharedMemory(name=memory_name)
+    buffers = SharedDetectionBuffers(memory, frame_shape, no_slots, max_faces)
+    try:
+        face_detect = ScaledFaceDetector(create_detector(detector_name), detection_scale)
+        predictor_landmarks = dlib.shape_predictor(landmarks_path)
+
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+
+            sequence, slot = task
+            start = time.perf_counter()
+            gray = buffers.frames[slot]
+            rects = sorted(face_detect(gray, 0), key=lambda rect: rect.left())[:max_faces]
+            for index, rect in enumerate(rects):
+                shape = predictor_landmarks(gray, rect)
+                buffers.boxes[slot, index] = face_utils.rect_to_bb(rect)
+                buffers.landmarks[slot, index] = shape_to_array(shape)
+
+            results.put((sequence, slot, len(rects), (time.perf_counter() - start) * 1000))
+    except Exception:
+        # Reported to the pool, the frames in flight would otherwise never complete
+        results.put((None, None, WORKER_FAILED, traceback.format_exc()))
+    finally:
+        del buffers
+        memory.close()
@@ -0,0 +1,158 @@
+import multiprocessing
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from detection.detection_utils import HOG
+from detection.detection_worker import NO_LANDMARKS, WORKER_FAILED, SharedDetectionBuffers, detection_worker
+from utils.Manager import LANDMARKS_MODEL_PATH
+
+LIVENESS_CHECK_TIME = 0.5  # seconds get() waits for a result before it checks the workers are still running
+
+
+class DetectionProcessPool:
+    """Face detection and landmark prediction spread over worker processes.
+
+    Gray frames are copied into a ring of shared memory slots and only (sequence, slot) pairs go through the task
+    queue, so frames are never pickled. The workers write the face boxes and landmarks of a frame next to it in the
+    same shared block. get() hands the results back in submission order; a slot is reused once its result is taken.
+    """
+
+    def __init__(self, no_workers, frame_shape, no_slots=None, max_faces=8, detector_name=HOG, detection_scale=1.0,
+                 landmarks_path=LANDMARKS_MODEL_PATH):
+        self._frame_shape = tuple(frame_shape)
+        self._no_slots = no_slots if no_slots is not None else 2 * no_workers
+        self._max_faces = max_faces
+
+        self._memory = shared_memory.SharedMemory(
+            create=True, size=SharedDetectionBuffers.size_of(self._frame_shape, self._no_slots, max_faces))
+        self._buffers = SharedDetectionBuffers(self._memory, self._frame_shape, self._no_slots, max_faces)
+
+        # Workers are spawned, forking a process that runs Qt and TensorFlow threads is not safe. Their target lives
+        # in the detection package so a worker does not import the Qt and audio modules of emotion_recognition
+        context = multiprocessing.get_context('spawn')
+        self._tasks = context.Queue()
+        self._results = context.Queue()
+        self._workers = [
+            context.Process(target=detection_worker,
+                            args=(self._memory.name, self._frame_shape, self._no_slots, max_faces, detector_name,
+                                  detection_scale, landmarks_path, self._tasks, self._results),
+                            name=f'face_detection_{index}', daemon=True)
+            for index in range(no_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+        self._free_slots = list(range(self._no_slots))
+        self._condition = threading.Condition()
+        self._items = {}  # {Sequence, (item, slot)}
+        self._completed = {}  # {Sequence, (no_faces, elapsed time)}
+        self._next_sequence = 0
+        self._next_result = 0
+
+    @property
+    def frame_shape(self):
+        return self._frame_shape
+
+    @property
+    def no_workers(self):
+        return len(self._workers)
+
+    def qsize(self):
+        with self._condition:
+            return self._no_slots - len(self._free_slots)
+
+    def submit(self, item, gray=None, timeout=None):
+        # Items without a frame take no slot, they just keep their place in the output order
+        if gray is not None and gray.shape != self._frame_shape:
+            raise ValueError(f"Frame of shape {gray.shape} does not fit the {self._frame_shape} slots")
+
+        with self._condition:
+            if gray is not None:
+                if len(self._free_slots) == 0:
+                    self._condition.wait(timeout)
+                if len(self._free_slots) == 0:
+                    return False
+                slot = self._free_slots.pop()
+                self._buffers.frames[slot] = gray
+            else:
+                slot = None
+
+            sequence = self._next_sequence
+            self._next_sequence += 1
+            self._items[sequence] = (item, slot)
+            if slot is None:
+                self._completed[sequence] = (0, 0)
+            else:
+                self._tasks.put((sequence, slot))
+            self._condition.notify_all()
+        return True
+
+    def get(self, timeout=None):
+        """Returns (item, boxes, landmarks, elapsed time in ms) of the next submitted item, or None on timeout.
+
+        boxes is a (no_faces, 4) array of (x, y, width, height), landmarks a (no_faces, 68, 2) array. Raises
+        RuntimeError once a worker failed or exited, since the results after its frame would never come.
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while True:
+            with self._condition:
+                if self._next_result in self._completed:
+                    return self._take_result()
+
+                if self._next_result == self._next_sequence:
+                    # Nothing in flight, wait for a submission like an empty queue would
+                    remaining_time = None if deadline is None else deadline - time.perf_counter()
+                    if remaining_time is not None and remaining_time <= 0:
+                        return None
+                    self._condition.wait(remaining_time)
+                    continue
+
+            remaining_time = None if deadline is None else deadline - time.perf_counter()
+            if remaining_time is not None and remaining_time <= 0:
+                return None
+            try:
+                sequence, _, no_faces, elapsed_time = self._results.get(
+                    timeout=LIVENESS_CHECK_TIME if remaining_time is None else min(remaining_time, LIVENESS_CHECK_TIME))
+            except queue.Empty:
+                self._check_workers()
+                continue
+            if no_faces == WORKER_FAILED:
+                # A failed worker sends its traceback in place of the elapsed time
+                raise RuntimeError(f"Face detection worker failed:\n{elapsed_time}")
+            with self._condition:
+                self._completed[sequence] = (no_faces, elapsed_time)
+
+    def _check_workers(self):
+        for worker in self._workers:
+            if not worker.is_alive():
+                raise RuntimeError(f"Face detection worker {worker.name} exited with code {worker.exitcode}")
+
+    def _take_result(self):
+        sequence = self._next_result
+        self._next_result += 1
+        item, slot = self._items.pop(sequence)
+        no_faces, elapsed_time = self._completed.pop(sequence)
+        if slot is None:
+            return item, np.empty((0, 4), dtype=np.int32), np.empty((0, NO_LANDMARKS, 2), dtype=np.int32), 0
+
+        boxes = self._buffers.boxes[slot, :no_faces].copy()
+        landmarks = self._buffers.landmarks[slot, :no_faces].copy()
+        self._free_slots.append(slot)
+        self._condition.notify_all()
+        return item, boxes, landmarks, elapsed_time
+
+    def close(self):
+        for _ in self._workers:
+            self._tasks.put(None)
+        for worker in self._workers:
+            worker.join(timeout=1)
+            if worker.is_alive():
+                worker.terminate()
+
+        del self._buffers
+        self._memory.close()
+        self._memory.unlink()
@@ -0,0 +1,68 @@
+import numpy as np
+
+from emotion_recognition.LandmarkFeatures import landmark_features
+
+
+class FaceAttributes:
+    """Eye state and glasses of the tracked faces, recomputed every few frames and smoothed over time.
+
+    The cached values of a face are dropped when the face changes, that is when its box jumps by more than half
+    its width, so a new person in the same place does not inherit them.
+    """
+
+    def __init__(self, interval=10, smoothing=0.5):
+        self._interval = interval
+        self._smoothing = smoothing
+        self._faces = {}  # {Face index, [box, frames since update, ear, glasses score]}
+
+    def reset(self):
+        self._faces.clear()
+
+    def update(self, faces, gray):
+        # faces: [(face_index, shape, (x, y, width, height)),...]
+        stale_faces = []  # [(position in faces, is new),...]
+        face_indexes = set()
+        for position, (face_index, _, box) in enumerate(faces):
+            face_indexes.add(face_index)
+            cached = self._faces.get(face_index)
+
+            if cached is None or self._has_changed(cached[0], box):
+                stale_faces.append((position, True))
+            elif cached[1] >= self._interval:
+                stale_faces.append((position, False))
+            else:
+                cached[1] += 1
+                cached[0] = box
+
+        # The faces due for an update are computed together, in one pass over their landmarks
+        if len(stale_faces) > 0:
+            landmarks = np.stack([faces[position][1] for position, _ in stale_faces])
+            ears, glasses = landmark_features(landmarks, gray)
+            for (position, is_new), ear, wears_glasses in zip(stale_faces, ears, glasses):
+                face_index, _, box = faces[position]
+                if is_new:
+                    self._faces[face_index] = [box, 0, float(ear), float(wears_glasses)]
+                else:
+                    cached = self._faces[face_index]
+                    cached[0] = box
+                    cached[1] = 0
+                    cached[2] += self._smoothing * (float(ear) - cached[2])
+                    cached[3] += self._smoothing * (float(wears_glasses) - cached[3])
+
+        for face_index in list(self._faces):
+            if face_index not in face_indexes:
+                del self._faces[face_index]
+
+        attributes = []
+        for face_index, _, _, _ in faces:
+            cached = self._faces[face_index]
+            attributes.append((cached[2], cached[3] >= 0.5))
+        return attributes  # [(eye aspect ratio, has glasses),...]
+
+    @staticmethod
+    def _has_changed(previous_box, box):
+        (previous_x, previous_y, previous_width, previous_height) = previous_box
+        (x, y, width, height) = box
+        displacement = abs((x + width / 2) - (previous_x + previous_width / 2)) + \
+            abs((y + height / 2) - (previous_y + previous_height / 2))
+        return displacement > previous_width / 2
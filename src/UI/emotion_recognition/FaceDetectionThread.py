@@ -1,46 +1,33 @@
+import threading
+import time
+
 import cv2
-import dlib
 import numpy as np
 from PySide6.QtCore import QObject
 from imutils import face_utils
-from scipy.ndimage import zoom
-from scipy.spatial import distance
-
-from PIL import Image
 
 # from PySide6.QtWidgets import QMessageBox
+from detection import create_detector
+from detection.ScaledFaceDetector import ScaledFaceDetector
+from detection.detection_utils import is_face_detected, shape_to_array
+from emotion_recognition.DetectionProcessPool import DetectionProcessPool
+from emotion_recognition.FaceAttributes import FaceAttributes
 from emotion_recognition.FaceEmotionDetectionThread import FaceEmotionDetectionThread
+from emotion_recognition.FaceWindows import FaceWindows
+from emotion_recognition.FaceTracker import FaceTracker
+from emotion_recognition.InferenceRateController import InferenceRateController
+from emotion_recognition.PredictionAggregator import PredictionAggregator
+from emotion_recognition.VideoFrame import VideoFrame
 from reports import DataStoreManager
 from utils import Settings
+from utils.DropOldestQueue import DropOldestQueue
+from utils.FrameMailbox import FrameMailbox
 from utils.Logger import Logger
 from utils.Manager import Manager
+from utils.StageTimings import StageTimings
 from utils.Timer import Timer
 
 
-def eye_aspect_ratio(eye):
-    A = distance.euclidean(eye[1], eye[5])
-    B = distance.euclidean(eye[2], eye[4])
-    C = distance.euclidean(eye[0], eye[3])
-    ear = (A + B) / (2.0 * C)
-    return ear
-
-
-def is_face_detected(face):
-    return face.shape[0] != 0 and face.shape[1] != 0
-
-
-def get_representative_frame(frame_to_predictions, selected_class):
-    frame_to_return = None
-    max_accuracy = 0
-    for frame, predictions in frame_to_predictions:
-        accuracy = predictions[selected_class]
-        if accuracy > max_accuracy:
-            max_accuracy = accuracy
-            frame_to_return = frame
-
-    return frame_to_return
-
-
 class FaceDetectionThread(QObject):
     def __init__(self, parent=None):
         super().__init__()
@@ -57,8 +44,13 @@ class FaceDetectionThread(QObject):
         self._no_classes = 7
         self._classes = {0: 'Angry', 1: 'Disgust', 2: 'Fear', 3: 'Happy', 4: 'Sad', 5: 'Surprise', 6: 'Neutral'}
 
-        self._nose_bridge = [28, 29, 30, 31, 33, 34, 35]
-        self._face_detect = dlib.get_frontal_face_detector()
+        self._face_detect = ScaledFaceDetector(create_detector(Settings.VIDEO_FACE_DETECTOR),
+                                               Settings.VIDEO_DETECTION_SCALE)
+        self._face_tracker = FaceTracker(self._face_detect,
+                                         min_interval=Settings.VIDEO_MIN_REDETECT_INTERVAL,
+                                         max_interval=Settings.VIDEO_MAX_REDETECT_INTERVAL,
+                                         min_quality=Settings.VIDEO_TRACKING_MIN_QUALITY)
+        self._face_attributes = FaceAttributes(Settings.VIDEO_ATTRIBUTES_INTERVAL, Settings.VIDEO_ATTRIBUTES_SMOOTHING)
 
         self._videoTextFont = cv2.QT_FONT_NORMAL
         self._videoTextFontScale = 0.5
@@ -75,12 +67,24 @@ class FaceDetectionThread(QObject):
         self.FACIAL_LANDMARKS_MOUTH = face_utils.FACIAL_LANDMARKS_IDXS["mouth"]
         self.FACIAL_LANDMARKS_JAW = face_utils.FACIAL_LANDMARKS_IDXS["jaw"]
 
-        self._frames = []
+        self._frames = FrameMailbox()
+        self._detect_queue = DropOldestQueue(Settings.VIDEO_STAGE_QUEUE_SIZE)
+        self._infer_queue = DropOldestQueue(Settings.VIDEO_STAGE_QUEUE_SIZE)
+        self._detection_pool = None  # DetectionProcessPool when Settings.VIDEO_DETECTION_PROCESSES > 0
+
+        self._rate_controller = InferenceRateController(target_fps=Settings.VIDEO_TARGET_FPS,
+                                                        cpu_budget=Settings.VIDEO_CPU_BUDGET,
+                                                        max_interval=Settings.VIDEO_MAX_PREDICTION_INTERVAL)
+        self._last_predicted_frame = None
+        self._smoothed_predictions = {}  # {Face index, probabilities}
 
         self._manager = Manager()
         self._data_store_manager = DataStoreManager()
+        self._face_windows = FaceWindows(self._classes, self._data_store_manager)
 
-        self.video_prediction = FaceEmotionDetectionThread()
+        self.stage_timings = StageTimings(enabled=Settings.VIDEO_STAGE_TIMINGS)
+        self.video_prediction = FaceEmotionDetectionThread(stage_timings=self.stage_timings)
+        self.video_prediction.set_callback(self._on_predictions)
 
     def get_label(self, argument):
         return self._classes.get(argument, "Invalid emotion")
@@ -95,41 +99,24 @@ class FaceDetectionThread(QObject):
         self._is_paused = False
 
     def get_frame(self):
-        if len(self._frames) > 0:
-            return self._frames.pop(0)
-        return None
-
-    def has_glasses(self, shape, frame):
-        landmarks = np.array([[p.x, p.y] for p in shape.parts()])
-
-        nose_bridge_x = []
-        nose_bridge_y = []
-
-        for i in self._nose_bridge:
-            nose_bridge_x.append(landmarks[i][0])
-            nose_bridge_y.append(landmarks[i][1])
-
-        # x_min and x_max
-        x_min = min(nose_bridge_x)
-        x_max = max(nose_bridge_x)
-
-        # ymin (from top eyebrow coordinate),  ymax
-        y_min = landmarks[20][1]
-        y_max = landmarks[30][1]
+        # Overlays are only drawn on the frames that are actually displayed
+        video_frame = self._frames.get_latest()
+        if video_frame is None:
+            return None
 
-        img2 = Image.fromarray(frame.astype(np.uint8))
-        img2 = img2.crop((x_min, y_min, x_max, y_max))
+        if not Settings.VIDEO_OVERLAYS or video_frame.predictions is None:
+            return video_frame.frame
 
-        img_blur = cv2.GaussianBlur(np.array(img2), (3, 3), sigmaX=0, sigmaY=0)
+        start = time.perf_counter()
+        frame = video_frame.frame.copy()
+        self.draw_overlays(frame, video_frame)
+        self.stage_timings.record('drawing', (time.perf_counter() - start) * 1000)
+        return frame
 
-        edges = cv2.Canny(image=img_blur, threshold1=100, threshold2=200)
-
-        edges_center = edges.T[(int(len(edges.T) / 2))]
-
-        if 255 in edges_center:
-            return True
-
-        return False
+    def detect_faces(self, gray):
+        if Settings.VIDEO_FACE_TRACKING:
+            return self._face_tracker.update(gray)
+        return sorted(self._face_detect(gray, 0), key=lambda rect: rect.left())
 
     def draw_face_dots(self, frame, shape):
         for (j, k) in shape:
@@ -200,20 +187,12 @@ class FaceDetectionThread(QObject):
                     fontScale=self._videoTextFontScale, color=self._videoTextColor,
                     thickness=self._videoTextThickness)
 
-    def draw_if_open_eyes(self, frame, shape):
-        (lStart, lEnd) = self.FACIAL_LANDMARKS_LEFT_EYE
-        (rStart, rEnd) = self.FACIAL_LANDMARKS_RIGHT_EYE
-        leftEye = shape[lStart:lEnd]
-        rightEye = shape[rStart:rEnd]
-        leftEAR = eye_aspect_ratio(leftEye)
-        rightEAR = eye_aspect_ratio(rightEye)
-        ear = (leftEAR + rightEAR) / 2.0
+    def draw_if_open_eyes(self, frame, ear):
         cv2.putText(img=frame, text="Eyes {}".format("Closed" if ear < self._ear_thresh else "Opened"),
                     org=(40, 400), fontFace=self._videoTextFont, fontScale=self._videoTextFontScale,
                     color=self._videoTextColor, thickness=self._videoTextThickness)
 
-    def draw_if_glasses(self, frame, shape_img, gray):
-        has_glasses = str(self.has_glasses(shape_img, gray))
+    def draw_if_glasses(self, frame, has_glasses):
         cv2.putText(img=frame, text="Glasses: {}".format(has_glasses),
                     org=(40, 380), fontFace=self._videoTextFont, fontScale=self._videoTextFontScale,
                     color=self._videoTextColor, thickness=self._videoTextThickness)
@@ -258,6 +237,177 @@ class FaceDetectionThread(QObject):
         cv2.drawContours(image=frame, contours=[eblHull], contourIdx=-1, color=(0, 255, 0), thickness=1)
         cv2.drawContours(image=frame, contours=[ebrHull], contourIdx=-1, color=(0, 255, 0), thickness=1)
 
+    def _has_open_windows(self):
+        # While paused, a tumbling window that already started is still completed
+        if Settings.VIDEO_AGGREGATION_MODE != PredictionAggregator.TUMBLING:
+            return False
+
+        return self._face_windows.has_open_windows
+
+    def get_prediction_rate(self):
+        # Predicted frames per second chosen by the rate controller
+        if not Settings.VIDEO_ADAPTIVE_RATE:
+            return Settings.VIDEO_TARGET_FPS
+        return self._rate_controller.prediction_rate
+
+    def get_queue_depths(self):
+        return {
+            'detect': self._detect_queue.qsize(),
+            'collect': self._detection_pool.qsize() if self._detection_pool is not None else 0,
+            'infer': self._infer_queue.qsize(),
+            'predict': self.video_prediction.get_queue_depth()
+        }
+
+    def _run_stage(self, name, stage, input_queue):
+        try:
+            while self._is_running:
+                video_frame = input_queue.get(timeout=0.1)
+                if video_frame is not None:
+                    stage(video_frame)
+        except Exception as ex:
+            self._logger.log_error(f"Video {name} stage failed: {ex}")
+            self._is_running = False
+
+    def _skip_prediction(self, video_frame):
+        # Skipped frames come back in capture order, right after the predicted frame they are displayed with
+        last_predicted_frame = self._last_predicted_frame
+        if last_predicted_frame is not None:
+            video_frame.faces = last_predicted_frame.faces
+            video_frame.attributes = last_predicted_frame.attributes
+            video_frame.predictions = last_predicted_frame.predictions
+        self._frames.put(video_frame)
+
+    def _add_face(self, video_frame, face_index, shape, box):
+        (x, y, width, height) = box
+        face = video_frame.gray[y:y + height, x:x + width]
+        if is_face_detected(face):
+            video_frame.faces.append((face_index, shape, (x, y, width, height)))
+
+    def _should_detect(self):
+        return not self._is_paused or self._has_open_windows()
+
+    def _detect_stage(self, video_frame):
+        if Settings.VIDEO_ADAPTIVE_RATE and not self._rate_controller.should_predict():
+            # Passed along without faces, in order with the frames being predicted
+            video_frame.is_predicted = False
+            if self._detection_pool is None:
+                self._infer_queue.put(video_frame)
+            else:
+                self._detection_pool.submit(video_frame)
+            return
+
+        start = time.perf_counter()
+        video_frame.gray = cv2.cvtColor(video_frame.frame, cv2.COLOR_BGR2GRAY)
+        converted_time = time.perf_counter()
+        self.stage_timings.record('grayscale', (converted_time - start) * 1000)
+        if self._detection_pool is not None:
+            if not self._should_detect():
+                self._detection_pool.submit(video_frame)
+                return
+
+            # Waits for a free shared memory slot, the detect queue drops frames meanwhile
+            while self._is_running and not self._detection_pool.submit(video_frame, video_frame.gray, timeout=0.1):
+                pass
+            return
+
+        rects = self.detect_faces(video_frame.gray)
+        detected_time = time.perf_counter()
+        self.stage_timings.record('detection', (detected_time - converted_time) * 1000)
+
+        if len(rects) and self._should_detect():
+            for face_index, rect in enumerate(rects):
+                shape = shape_to_array(self._manager.video_predictor_landmarks(video_frame.gray, rect))
+                self._add_face(video_frame, face_index, shape, face_utils.rect_to_bb(rect))
+            landmarks_time = time.perf_counter()
+            self.stage_timings.record('landmarks', (landmarks_time - detected_time) * 1000)
+
+            video_frame.attributes = self._face_attributes.update(video_frame.faces, video_frame.gray)
+            self.stage_timings.record('attributes', (time.perf_counter() - landmarks_time) * 1000)
+
+        self._rate_controller.record_detection((time.perf_counter() - start) * 1000)
+        self._infer_queue.put(video_frame)
+
+    def _collect_stage(self, detection):
+        # Results of the detection processes, in capture order
+        video_frame, boxes, landmarks, elapsed_time = detection
+        if not video_frame.is_predicted:
+            self._infer_queue.put(video_frame)
+            return
+
+        # Detection and landmarks of a frame are timed together in the worker process
+        self.stage_timings.record('detection', elapsed_time)
+        if len(boxes):
+            for face_index, (box, shape) in enumerate(zip(boxes, landmarks)):
+                self._add_face(video_frame, face_index, shape, tuple(int(value) for value in box))
+
+            start = time.perf_counter()
+            video_frame.attributes = self._face_attributes.update(video_frame.faces, video_frame.gray)
+            self.stage_timings.record('attributes', (time.perf_counter() - start) * 1000)
+
+        # The workers detect in parallel, so a frame costs a share of their time
+        self._rate_controller.record_detection(elapsed_time / self._detection_pool.no_workers)
+        self._infer_queue.put(video_frame)
+
+    def _infer_stage(self, video_frame):
+        for face_index, max_prediction in self._face_windows.poll(video_frame.timestamp):
+            print(f"Video prediction (face {face_index}): {max_prediction}")
+
+        # Every frame comes back through _on_predictions in capture order, the faces batched with other frames
+        self.video_prediction.queue_data(video_frame)
+
+    def _on_predictions(self, video_frame):
+        if not self._is_running:
+            return
+
+        if not video_frame.is_predicted:
+            self._skip_prediction(video_frame)
+            return
+
+        if len(video_frame.faces) == 0:
+            self._last_predicted_frame = video_frame
+            self._frames.put(video_frame)
+            return
+
+        if video_frame.predictions is None:
+            # Its batch failed, it is displayed like a skipped frame and left out of the aggregation
+            self._skip_prediction(video_frame)
+            return
+
+        self._rate_controller.record_inference(video_frame.inference_time)
+
+        for index, (face_index, _, _) in enumerate(video_frame.faces):
+            self._face_windows.add(video_frame.timestamp, face_index, video_frame.frame,
+                                   video_frame.predictions[index])
+
+        # Displayed labels are smoothed over time, so they stay stable at low prediction rates
+        video_frame.predictions = video_frame.predictions.copy()
+        for index, (face_index, _, _) in enumerate(video_frame.faces):
+            smoothed_prediction = self._smoothed_predictions.get(face_index)
+            if smoothed_prediction is not None:
+                video_frame.predictions[index] = smoothed_prediction + Settings.VIDEO_PREDICTION_SMOOTHING * \
+                    (video_frame.predictions[index] - smoothed_prediction)
+            self._smoothed_predictions[face_index] = video_frame.predictions[index]
+
+        self._last_predicted_frame = video_frame
+        self._frames.put(video_frame)
+
+    def draw_overlays(self, frame, video_frame):
+        for index, (_, shape, (x, y, width, height)) in enumerate(video_frame.faces):
+            prediction = video_frame.predictions[index:index + 1]
+            if index == 0:
+                ear, has_glasses = video_frame.attributes[index]
+                self.draw_predictions(frame, prediction)
+                self.draw_if_open_eyes(frame, ear)
+                self.draw_if_glasses(frame, has_glasses)
+            self.draw_rectangle(frame, x, y, width, height)
+            self.draw_main_prediction(frame, prediction, x, y, width)
+            self.draw_eyes(frame, shape)
+            self.draw_nose(frame, shape)
+            self.draw_mouth(frame, shape)
+            self.draw_jaw(frame, shape)
+            self.draw_eyebrows(frame, shape)
+            self.draw_face_dots(frame, shape)
+
     def work(self):
         if not self._manager.is_camera_available():
             # QMessageBox.warning(self._calling_window, "Video", "There is no video input device available.")
@@ -268,80 +418,43 @@ class FaceDetectionThread(QObject):
         self._is_paused = False
         self._abort = False
 
-        predictions_map = {}
-        frame_to_predictions = []
+        self._face_tracker.reset()
+        self._face_attributes.reset()
+        self._rate_controller.reset()
+        self._last_predicted_frame = None
+        self._smoothed_predictions.clear()
+        self._face_windows.clear()
+        self.stage_timings.clear()
+        self.video_prediction.clear()
+
+        # capture (this thread) -> detect -> infer, each stage on its own thread, then the display mailbox
+        stages = [
+            threading.Thread(target=self._run_stage, args=('detect', self._detect_stage, self._detect_queue),
+                             name='video_detect_stage', daemon=True),
+            threading.Thread(target=self._run_stage, args=('infer', self._infer_stage, self._infer_queue),
+                             name='video_infer_stage', daemon=True)
+        ]
+        if Settings.VIDEO_DETECTION_PROCESSES > 0:
+            # detect -> detection processes -> collect -> infer
+            frame_shape = (int(self._manager.active_camera.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                           int(self._manager.active_camera.get(cv2.CAP_PROP_FRAME_WIDTH)))
+            self._detection_pool = DetectionProcessPool(Settings.VIDEO_DETECTION_PROCESSES, frame_shape,
+                                                        detector_name=Settings.VIDEO_FACE_DETECTOR,
+                                                        detection_scale=Settings.VIDEO_DETECTION_SCALE)
+            stages.append(threading.Thread(target=self._run_stage,
+                                           args=('collect', self._collect_stage, self._detection_pool),
+                                           name='video_collect_stage', daemon=True))
+        for stage in stages:
+            stage.start()
+
         timer = Timer()
         timer.start()
-        start_time = timer.record_time()
-        target_time = 4 * 1000
         try:
             while self._is_running and Settings.VIDEO_PREDICTION:
+                start = time.perf_counter()
                 _, frame = self._manager.active_camera.read()
-
-                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                rects = self._face_detect(gray, 0)
-
-                if len(predictions_map) == 0:
-                    start_time = timer.record_time()
-
-                current_time = timer.record_time()
-                seconds_passed = current_time - start_time
-                seconds = timer.record_time()
-                if seconds_passed > target_time and len(predictions_map) > 0:
-                    max_prediction = max(predictions_map, key=predictions_map.get)
-                    print(f"Video prediction: {max_prediction}")
-                    highest_class_index = [k for k, v in self._classes.items() if v == max_prediction][0]
-                    representative_frame = get_representative_frame(frame_to_predictions, highest_class_index)
-                    self._data_store_manager.insert_video((seconds, (representative_frame, max_prediction)))
-
-                    predictions_map.clear()
-                    frame_to_predictions.clear()
-                    start_time = timer.record_time()
-
-                if len(rects) and (not self._is_paused or len(predictions_map) > 0):
-                    shape_img = self._manager.video_predictor_landmarks(gray, rects[0])
-                    shape = face_utils.shape_to_np(shape_img)
-
-                    (x, y, width, height) = face_utils.rect_to_bb(rects[0])
-                    face = gray[y:y + height, x:x + width]
-
-                    if is_face_detected(face):
-                        # Zoom on extracted face
-                        face = zoom(face, (self._shape_x / face.shape[0], self._shape_y / face.shape[1]))
-
-                        # Cast type float
-                        face = face.astype(np.float32)
-
-                        # Scale
-                        face /= float(face.max(initial=None))
-                        face = np.reshape(face.flatten(), (1, 48, 48, 1))
-
-                        self.video_prediction.queue_data(face)
-                        prediction = self._manager.video_model.predict(face)
-                        if prediction is None:
-                            continue
-
-                        frame_to_predictions.append((frame, prediction[0]))
-                        prediction_emotion = self.get_label(np.argmax(prediction[0]))
-                        predictions_map[prediction_emotion] = predictions_map[prediction_emotion] + 1 \
-                            if prediction_emotion in predictions_map else 1
-
-                        self.draw_predictions(frame, prediction)
-                        self.draw_rectangle(frame, x, y, width, height)
-                        self.draw_main_prediction(frame, prediction, x, y, width)
-                        self.draw_if_open_eyes(frame, shape)
-                        self.draw_if_glasses(frame, shape_img, gray)
-                        self.draw_eyes(frame, shape)
-                        self.draw_nose(frame, shape)
-                        self.draw_mouth(frame, shape)
-                        self.draw_jaw(frame, shape)
-                        self.draw_eyebrows(frame, shape)
-                        self.draw_face_dots(frame, shape)
-
-                self._frames.append(frame)
-
-                if cv2.waitKey(1) & 0xFF == ord('q'):
-                    break
+                self.stage_timings.record('camera_read', (time.perf_counter() - start) * 1000)
+                self._detect_queue.put(VideoFrame(timer.record_time(), frame))
 
             timer.stop()
         except Exception as ex:
@@ -350,6 +463,26 @@ class FaceDetectionThread(QObject):
             self._manager.active_camera.release()
             raise Exception(ex)
         finally:
+            self._is_running = False
+            for stage in stages:
+                stage.join()
+
+            self.stage_timings.log(self._logger, "Video pipeline stage timings")
+            if Settings.VIDEO_STAGE_TIMINGS_FILE:
+                try:
+                    self.stage_timings.dump(Settings.VIDEO_STAGE_TIMINGS_FILE)
+                except OSError as ex:
+                    self._logger.log_error(f"Could not write the stage timings: {ex}")
+            self._logger.log_info(f"Video prediction rate: {self.get_prediction_rate():.1f} frames/sec")
+            self._logger.log_info(f"Video pipeline dropped {self._detect_queue.dropped_items} captured, "
+                                  f"{self._infer_queue.dropped_items} detected and "
+                                  f"{self.video_prediction.dropped_frames} not yet predicted frames, "
+                                  f"{self._frames.dropped_frames} processed frames were never displayed")
+            if self._detection_pool is not None:
+                self._detection_pool.close()
+                self._detection_pool = None
+            self._detect_queue.clear()
+            self._infer_queue.clear()
             self._frames.clear()
             self.video_prediction.abort()
 
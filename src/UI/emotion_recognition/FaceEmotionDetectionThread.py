@@ -1,46 +1,134 @@
+import time
+
 from PySide6.QtCore import QObject
-from reports import DataStoreManager
-from utils import Manager
+
+from emotion_recognition.FacePreprocessor import FacePreprocessor
+from utils import Manager, Logger, Settings
+from utils.DropOldestQueue import DropOldestQueue
+from utils.StageTimings import StageTimings
 
 
 class FaceEmotionDetectionThread(QObject):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, stage_timings=None):
         super().__init__()
         self._parent = parent
+        self._logger = Logger()
 
         self._manager = Manager()
-        self._data_store_manager = DataStoreManager()
 
         self._is_running = False
         self._classes = {0: 'Angry', 1: 'Disgust', 2: 'Fear', 3: 'Happy', 4: 'Sad', 5: 'Surprise', 6: 'Neutral'}
 
-        self._data_to_predict_list = []  # [(timestamp, y),...]
-        self._predictions = []
+        self._batch_size = Settings.VIDEO_INFERENCE_BATCH_SIZE
+        self._max_delay = Settings.VIDEO_INFERENCE_MAX_DELAY
+        self._face_preprocessor = FacePreprocessor(max_faces=self._batch_size)
+
+        self._stage_timings = stage_timings if stage_timings is not None else StageTimings(enabled=False)
+        # Frames without faces pass through too, so the callback sees every frame in capture order
+        self._data_to_predict = DropOldestQueue(Settings.VIDEO_INFERENCE_QUEUE_SIZE)  # [VideoFrame,...]
+        self._callback = None
+
+    def set_callback(self, callback):
+        # Called from this worker's thread with every queued VideoFrame, in order, once its predictions are set.
+        # Frames of a batch that could not be predicted are handed back with their predictions left to None
+        self._callback = callback
+
+    def _gather_batch(self):
+        video_frame = self._data_to_predict.get(timeout=0.1)
+        if video_frame is None:
+            return []
+
+        batch = [video_frame]
+        no_faces = len(video_frame.faces)
+        if no_faces == 0:
+            # Nothing to batch, it is handed back right away
+            return batch
+
+        deadline = time.perf_counter() + self._max_delay
+        while no_faces < self._batch_size:
+            remaining_time = deadline - time.perf_counter()
+            if remaining_time <= 0:
+                break
+
+            video_frame = self._data_to_predict.get(timeout=remaining_time)
+            if video_frame is None:
+                break
+
+            batch.append(video_frame)
+            no_faces += len(video_frame.faces)
+
+        return batch
+
+    def _predict(self, batch):
+        start = time.perf_counter()
+        no_faces = 0
+        for video_frame in batch:
+            for _, _, (x, y, width, height) in video_frame.faces:
+                self._face_preprocessor.resize(video_frame.gray[y:y + height, x:x + width], no_faces)
+                no_faces += 1
 
-    def _predict(self, data):
-        return self._manager.video_model.predict(data)
+        if no_faces == 0:
+            return
+
+        preprocessed_time = time.perf_counter()
+
+        # One forward pass for every face of every gathered frame
+        predictions = self._manager.video_model.predict(self._face_preprocessor.faces(no_faces))
+        if predictions is None:
+            self._logger.log_warning(f"Video model returned no predictions for {no_faces} faces")
+            return
+        end = time.perf_counter()
+        self._stage_timings.record('preprocessing', (preprocessed_time - start) * 1000)
+        self._stage_timings.record('predict', (end - preprocessed_time) * 1000)
+        inference_time = (end - start) * 1000 / sum(1 for video_frame in batch if len(video_frame.faces) > 0)
+
+        index = 0
+        for video_frame in batch:
+            if len(video_frame.faces) > 0:
+                video_frame.predictions = predictions[index:index + len(video_frame.faces)]
+                video_frame.inference_time = inference_time
+                index += len(video_frame.faces)
+
+    def _pass_through(self, batch):
+        if self._callback is None:
+            return
+        for video_frame in batch:
+            self._callback(video_frame)
 
     def work(self):
         self._is_running = True
-        while self._is_running or len(self._data_to_predict_list) > 0:
-
-            timestamp, data = self._data_to_predict_list.pop(0)
-            if data is None or len(data) == 0:
+        while self._is_running or self._data_to_predict.qsize() > 0:
+            batch = self._gather_batch()
+            if len(batch) == 0:
                 continue
 
-            predictions = self._predict(data)
-            if predictions is not None:
-                prediction = predictions[0]
-                self._predictions.append(prediction)
+            try:
+                self._predict(batch)
+            except Exception as ex:
+                self._logger.log_error(ex)
+                for video_frame in batch:
+                    video_frame.predictions = None
 
-    def queue_data(self, data):
-        self._data_to_predict_list.append(data)
+            try:
+                self._pass_through(batch)
+            except Exception as ex:
+                self._logger.log_error(ex)
 
-    def abort(self):
-        self._is_running = False
+    def queue_data(self, video_frame):
+        # When predict falls behind, the oldest waiting frame is dropped
+        if video_frame is None:
+            return
+        self._data_to_predict.put(video_frame)
+
+    @property
+    def dropped_frames(self):
+        return self._data_to_predict.dropped_items
+
+    def clear(self):
+        self._data_to_predict.clear()
 
-    def get_latest_prediction(self):
-        if len(self._predictions) == 0:
-            return None
+    def get_queue_depth(self):
+        return self._data_to_predict.qsize()
 
-        return self._predictions.pop(0)
+    def abort(self):
+        self._is_running = False
@@ -0,0 +1,46 @@
+import cv2
+import numpy as np
+
+
+class FacePreprocessor:
+    """Resizes face crops straight into a reusable float32 (N, 48, 48, 1) model input buffer.
+
+    The returned batch is a view on the internal buffer, it is overwritten by the next call.
+    """
+
+    def __init__(self, max_faces=4, shape_x=48, shape_y=48):
+        self._shape_x = shape_x
+        self._shape_y = shape_y
+        self._resized = np.empty((shape_x, shape_y), dtype=np.uint8)
+        self._buffer = np.empty((max_faces, shape_x, shape_y, 1), dtype=np.float32)
+
+    @property
+    def capacity(self):
+        return self._buffer.shape[0]
+
+    def _reserve(self, no_faces):
+        if no_faces > self.capacity:
+            buffer = np.empty((max(no_faces, 2 * self.capacity), self._shape_x, self._shape_y, 1), dtype=np.float32)
+            buffer[:self.capacity] = self._buffer
+            self._buffer = buffer
+
+    def resize(self, face, index):
+        self._reserve(index + 1)
+
+        # Area interpolation straight into the scratch image, then cast into the model input slot
+        cv2.resize(face, (self._shape_y, self._shape_x), dst=self._resized, interpolation=cv2.INTER_AREA)
+        slot = self._buffer[index, :, :, 0]
+        slot[...] = self._resized
+
+        # Scale in place
+        max_value = self._resized.max()
+        if max_value > 0:
+            np.multiply(slot, 1.0 / max_value, out=slot)
+
+    def faces(self, no_faces):
+        return self._buffer[:no_faces]
+
+    def preprocess(self, gray, boxes):
+        for index, (x, y, width, height) in enumerate(boxes):
+            self.resize(gray[y:y + height, x:x + width], index)
+        return self.faces(len(boxes))
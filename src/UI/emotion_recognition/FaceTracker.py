@@ -0,0 +1,84 @@
+import dlib
+
+
+def _to_rectangle(position):
+    return dlib.rectangle(int(position.left()), int(position.top()), int(position.right()), int(position.bottom()))
+
+
+def _motion(previous_rect, rect):
+    # Displacement of the face center relative to the face width
+    previous_center = previous_rect.center()
+    center = rect.center()
+    displacement = abs(center.x - previous_center.x) + abs(center.y - previous_center.y)
+    return displacement / max(previous_rect.width(), 1)
+
+
+class FaceTracker:
+    """Runs the face detector every few frames and follows the faces with correlation trackers in between.
+
+    The re-detection interval adapts to motion: it halves when the faces move fast and grows by one frame while
+    they stay still. A full detection is also forced as soon as one of the trackers loses confidence.
+    """
+
+    def __init__(self, detector, min_interval=2, max_interval=15, min_quality=7.0, motion_threshold=0.05):
+        self._detector = detector
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._min_quality = min_quality
+        self._motion_threshold = motion_threshold
+
+        self._trackers = []
+        self._rects = []
+        self._interval = min_interval
+        self._frames_since_detection = 0
+
+    @property
+    def interval(self):
+        return self._interval
+
+    def reset(self):
+        self._trackers = []
+        self._rects = []
+        self._interval = self._min_interval
+        self._frames_since_detection = 0
+
+    def update(self, image):
+        if len(self._trackers) == 0 or self._frames_since_detection >= self._interval:
+            return self._detect(image)
+
+        rects = []
+        for tracker in self._trackers:
+            quality = tracker.update(image)
+            if quality < self._min_quality:
+                self._interval = self._min_interval
+                return self._detect(image)
+            rects.append(_to_rectangle(tracker.get_position()))
+
+        self._adapt_interval(rects)
+        self._rects = rects
+        self._frames_since_detection += 1
+        return rects
+
+    def _detect(self, image):
+        rects = sorted(self._detector(image, 0), key=lambda rect: rect.left())
+
+        self._trackers = []
+        for rect in rects:
+            tracker = dlib.correlation_tracker()
+            tracker.start_track(image, rect)
+            self._trackers.append(tracker)
+
+        self._rects = rects
+        self._frames_since_detection = 0
+        return rects
+
+    def _adapt_interval(self, rects):
+        if len(self._rects) != len(rects):
+            return
+
+        max_motion = max((_motion(previous_rect, rect) for previous_rect, rect in zip(self._rects, rects)),
+                         default=0)
+        if max_motion > self._motion_threshold:
+            self._interval = max(self._min_interval, self._interval // 2)
+        else:
+            self._interval = min(self._max_interval, self._interval + 1)
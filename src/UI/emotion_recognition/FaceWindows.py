@@ -0,0 +1,72 @@
+import threading
+
+import numpy as np
+
+from emotion_recognition.PredictionAggregator import PredictionAggregator
+from emotion_recognition.RepresentativeFrameSelector import RepresentativeFrameSelector
+from utils.Settings import Settings
+
+
+class FaceWindows:
+    """The video aggregation windows of every face, stored in the DataStoreManager once they are due.
+
+    Each face index has its own aggregator and representative frames. Both the live capture and VideoFileAnalyzer
+    store their video predictions through it, and it can be shared between threads. Face indexes are positions from
+    left to right, so a window mixes two people if they swap places or one of them leaves the frame.
+    """
+
+    def __init__(self, classes, data_store_manager):
+        self._classes = classes
+        self._data_store_manager = data_store_manager
+        self._windows = {}  # {Face index, (aggregator, representative_frames)}
+        self._lock = threading.Lock()
+
+    @property
+    def has_open_windows(self):
+        with self._lock:
+            return any(not aggregator.is_empty for aggregator, _ in self._windows.values())
+
+    def clear(self):
+        with self._lock:
+            self._windows.clear()
+
+    def add(self, timestamp, face_index, frame, prediction):
+        with self._lock:
+            if face_index not in self._windows:
+                self._windows[face_index] = (self._create_aggregator(), RepresentativeFrameSelector(len(self._classes)))
+            aggregator, representative_frames = self._windows[face_index]
+
+            aggregator.add(timestamp, prediction)
+            representative_frames.update(frame, prediction)
+
+    def poll(self, timestamp):
+        """Stores the windows due at timestamp, returns the [(face index, label),...] that were stored."""
+        with self._lock:
+            return self._store_windows(timestamp, lambda aggregator: aggregator.poll(timestamp))
+
+    def flush(self, timestamp):
+        # Stores whatever is left in the windows, e.g. at the end of a recording
+        with self._lock:
+            return self._store_windows(timestamp, lambda aggregator: aggregator.flush())
+
+    def _create_aggregator(self):
+        return PredictionAggregator(mode=Settings.VIDEO_AGGREGATION_MODE,
+                                    window_time=Settings.VIDEO_AGGREGATION_WINDOW,
+                                    hop_time=Settings.VIDEO_AGGREGATION_HOP,
+                                    smoothing=Settings.VIDEO_AGGREGATION_SMOOTHING,
+                                    no_classes=len(self._classes))
+
+    def _store_windows(self, timestamp, close_window):
+        stored = []
+        for face_index, (aggregator, representative_frames) in self._windows.items():
+            probabilities = close_window(aggregator)
+            if probabilities is None:
+                continue
+
+            highest_class_index = int(np.argmax(probabilities))
+            label = self._classes.get(highest_class_index, "Invalid emotion")
+            representative_frame = representative_frames.get_representative_frame(highest_class_index)
+            representative_frames.clear()
+            self._data_store_manager.insert_video((timestamp, (representative_frame, label)), face_index)
+            stored.append((face_index, label))
+        return stored
@@ -0,0 +1,63 @@
+import math
+
+
+class InferenceRateController:
+    """Picks how often faces are detected and predicted so the work fits a CPU budget at the target display FPS.
+
+    Detection and inference latencies are measured online and smoothed with an exponential moving average. Every
+    interval-th frame is predicted, where the interval is the smallest one for which the prediction work per
+    displayed frame stays under cpu_budget of the frame time.
+    """
+
+    def __init__(self, target_fps=30, cpu_budget=0.5, max_interval=10, smoothing=0.1):
+        self._frame_time = 1000 / target_fps
+        self._target_fps = target_fps
+        self._cpu_budget = cpu_budget
+        self._max_interval = max_interval
+        self._smoothing = smoothing
+
+        self._detection_time = 0
+        self._inference_time = 0
+        self._interval = 1
+        self._frames_since_prediction = 0
+
+    @property
+    def interval(self):
+        return self._interval
+
+    @property
+    def prediction_rate(self):
+        # Predicted frames per second
+        return self._target_fps / self._interval
+
+    def reset(self):
+        self._detection_time = 0
+        self._inference_time = 0
+        self._interval = 1
+        self._frames_since_prediction = 0
+
+    def should_predict(self):
+        self._frames_since_prediction += 1
+        if self._frames_since_prediction < self._interval:
+            return False
+
+        self._frames_since_prediction = 0
+        return True
+
+    def record_detection(self, elapsed_time):
+        self._detection_time = self._average(self._detection_time, elapsed_time)
+        self._update_interval()
+
+    def record_inference(self, elapsed_time):
+        self._inference_time = self._average(self._inference_time, elapsed_time)
+        self._update_interval()
+
+    def _average(self, average, elapsed_time):
+        if average == 0:
+            return elapsed_time
+        return average + self._smoothing * (elapsed_time - average)
+
+    def _update_interval(self):
+        prediction_time = self._detection_time + self._inference_time
+        interval = math.ceil(prediction_time / (self._cpu_budget * self._frame_time))
+        self._interval = min(max(interval, 1), self._max_interval)
@@ -0,0 +1,52 @@
+import cv2
+import numpy as np
+
+# Indexes into the 68 point dlib landmarks
+EYES = np.arange(36, 48)  # right eye then left eye, 6 points each
+NOSE_BRIDGE = np.array([28, 29, 30, 31, 33, 34, 35])
+EYEBROW_TOP = 20
+NOSE_TIP = 30
+
+
+def _aspect_ratio(points, vertical_pairs, horizontal_pair):
+    # points: (..., n, 2), the summed vertical distances over twice the horizontal one
+    top, bottom = zip(*vertical_pairs)
+    vertical = np.linalg.norm(points[..., top, :] - points[..., bottom, :], axis=-1).sum(axis=-1)
+    horizontal = np.linalg.norm(points[..., horizontal_pair[0], :] - points[..., horizontal_pair[1], :], axis=-1)
+    return vertical / (len(vertical_pairs) * horizontal)
+
+
+def eye_aspect_ratio(landmarks):
+    # landmarks: (K, 68, 2) -> (K,) eye aspect ratio averaged over both eyes
+    eyes = landmarks[:, EYES].reshape(-1, 2, 6, 2).astype(np.float32)
+    return _aspect_ratio(eyes, ((1, 5), (2, 4)), (0, 3)).mean(axis=1)
+
+
+def glasses_regions(landmarks):
+    # landmarks: (K, 68, 2) -> (K, 4) boxes of (x_min, y_min, x_max, y_max) around the nose bridge
+    nose_bridge = landmarks[:, NOSE_BRIDGE, 0]
+    regions = np.stack((nose_bridge.min(axis=1), landmarks[:, EYEBROW_TOP, 1],
+                        nose_bridge.max(axis=1), landmarks[:, NOSE_TIP, 1]), axis=1)
+    return np.maximum(regions, 0)
+
+
+def has_glasses(landmarks, gray):
+    # Glasses bridges show up as an edge in the middle of the nose bridge, between the eyebrows and the nose
+    glasses = np.zeros(len(landmarks), dtype=bool)
+    for index, (x_min, y_min, x_max, y_max) in enumerate(glasses_regions(landmarks)):
+        crop = gray[y_min:y_max, x_min:x_max]
+        if crop.shape[0] == 0 or crop.shape[1] == 0:
+            continue
+
+        img_blur = cv2.GaussianBlur(crop, (3, 3), sigmaX=0, sigmaY=0)
+        edges = cv2.Canny(image=img_blur, threshold1=100, threshold2=200)
+        glasses[index] = edges[:, edges.shape[1] // 2].any()
+    return glasses
+
+
+def landmark_features(landmarks, gray):
+    """Eye aspect ratio and glasses of K faces from their (K, 68, 2) landmarks."""
+    landmarks = np.asarray(landmarks)
+    if len(landmarks) == 0:
+        return np.empty(0, dtype=np.float32), np.empty(0, dtype=bool)
+    return eye_aspect_ratio(landmarks), has_glasses(landmarks, gray)
@@ -0,0 +1,81 @@
+import inspect
+from functools import lru_cache
+
+import librosa
+import numpy as np
+import scipy.fft
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class MelSpectrogramExtractor:
+    """Log-mel spectrograms of batches of signals, matching librosa.stft + melspectrogram + power_to_db(ref=np.max).
+
+    The window and the mel filterbank are built once. Every signal of a batch is framed with a strided view and
+    transformed by a single rFFT call.
+    """
+
+    def __init__(self, sr=16000, n_fft=512, win_length=256, hop_length=128, window='hamming', n_mels=128, fmax=4000,
+                 top_db=80.0, amin=1e-10):
+        self._n_fft = n_fft
+        self._hop_length = hop_length
+        self._top_db = top_db
+        self._amin = amin
+
+        # The window is centered in the n_fft frame, the way librosa.stft pads it
+        self._window = librosa.util.pad_center(librosa.filters.get_window(window, win_length, fftbins=True),
+                                               size=n_fft).astype(np.float32)
+        self._mel_basis = librosa.filters.mel(sr=sr, n_fft=n_fft, n_mels=n_mels, fmax=fmax).astype(np.float32)
+        # Signals are padded like the installed librosa pads them, its default changed across versions
+        self._pad_mode = inspect.signature(librosa.stft).parameters['pad_mode'].default
+
+    @staticmethod
+    def zscore(signals):
+        # (K, n) -> every signal normalized to zero mean and unit variance, like scipy.stats.zscore. A constant
+        # signal, e.g. silence, has no variance: it is only centered, to zeros, instead of turning into NaN.
+        # Float signals are normalized in their own precision, integer ones in float32
+        signals = np.asarray(signals)
+        if not np.issubdtype(signals.dtype, np.floating):
+            signals = signals.astype(np.float32)
+        mean = signals.mean(axis=-1, keepdims=True)
+        std = signals.std(axis=-1, keepdims=True)
+        std[std == 0] = 1
+        return (signals - mean) / std
+
+    def power_spectrogram(self, signals):
+        # (K, n) -> (K, 1 + n_fft / 2, frames)
+        signals = np.asarray(signals, dtype=np.float32)
+        padding = [(0, 0)] * (signals.ndim - 1) + [(self._n_fft // 2, self._n_fft // 2)]
+        padded = np.pad(signals, padding, mode=self._pad_mode)
+
+        frames = sliding_window_view(padded, self._n_fft, axis=-1)[..., ::self._hop_length, :]
+        # scipy's rFFT keeps float32 frames in single precision, numpy's computes them in double
+        spectrum = scipy.fft.rfft(frames * self._window, axis=-1)
+        power = spectrum.real ** 2 + spectrum.imag ** 2
+        return np.swapaxes(power, -1, -2).astype(np.float32, copy=False)
+
+    def mel_spectrogram(self, signals):
+        """(n,) or (K, n) signals -> (n_mels, frames) or (K, n_mels, frames) log-mel spectrograms in dB."""
+        signals = np.asarray(signals)
+        is_single = signals.ndim == 1
+        if is_single:
+            signals = signals[np.newaxis]
+
+        mel_spect = np.matmul(self._mel_basis, self.power_spectrogram(signals))
+
+        # power_to_db, with every spectrogram referenced to its own maximum
+        log_spect = 10.0 * np.log10(np.maximum(mel_spect, self._amin))
+        reference = 10.0 * np.log10(np.maximum(mel_spect.max(axis=(1, 2), keepdims=True), self._amin))
+        log_spect -= reference
+        np.maximum(log_spect, log_spect.max(axis=(1, 2), keepdims=True) - self._top_db, out=log_spect)
+
+        return log_spect[0] if is_single else log_spect
+
+    def __call__(self, chunks):
+        # (K, n) audio chunks -> (K, n_mels, frames) z-scored log-mel spectrograms
+        return self.mel_spectrogram(self.zscore(chunks))
+
+
+@lru_cache(maxsize=None)
+def get_mel_extractor(sr=16000, n_fft=512, win_length=256, hop_length=128, window='hamming', n_mels=128, fmax=4000):
+    # One extractor per parameter set, shared by the live prediction and the report views
+    return MelSpectrogramExtractor(sr, n_fft, win_length, hop_length, window, n_mels, fmax)
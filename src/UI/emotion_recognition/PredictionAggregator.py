@@ -0,0 +1,88 @@
+from collections import deque
+
+import numpy as np
+
+
+class PredictionAggregator:
+    """Averages probability vectors over time, in O(1) per prediction.
+
+    - tumbling: the mean of back to back windows of window_time ms
+    - sliding: the mean of the last window_time ms, emitted every hop_time ms
+    - ema: an exponential moving average, emitted every hop_time ms
+
+    add() takes the time a prediction starts at, poll() the current time and returns the aggregated probabilities
+    when a window (or hop) is due, None otherwise.
+    """
+    TUMBLING = 'tumbling'
+    SLIDING = 'sliding'
+    EMA = 'ema'
+
+    def __init__(self, mode=TUMBLING, window_time=4 * 1000, hop_time=None, smoothing=0.3, no_classes=7):
+        if mode not in (PredictionAggregator.TUMBLING, PredictionAggregator.SLIDING, PredictionAggregator.EMA):
+            raise ValueError(f"Unknown aggregation mode {mode}")
+
+        self._mode = mode
+        self._window_time = window_time
+        self._hop_time = window_time if hop_time is None or mode == PredictionAggregator.TUMBLING else hop_time
+        self._smoothing = smoothing
+
+        self._sum = np.zeros(no_classes, dtype=np.float64)
+        self._count = 0
+        self._window = deque()  # [(timestamp, probabilities),...], sliding mode only
+        self._start_time = None
+
+    @property
+    def is_empty(self):
+        return self._count == 0
+
+    def clear(self):
+        self._sum.fill(0)
+        self._count = 0
+        self._window.clear()
+        self._start_time = None
+
+    def add(self, timestamp, probabilities):
+        if self._start_time is None:
+            self._start_time = timestamp
+
+        if self._mode == PredictionAggregator.EMA:
+            if self._count == 0:
+                self._sum[:] = probabilities
+            else:
+                self._sum += self._smoothing * (probabilities - self._sum)
+            self._count = 1
+            return
+
+        self._sum += probabilities
+        self._count += 1
+        if self._mode == PredictionAggregator.SLIDING:
+            self._window.append((timestamp, probabilities))
+
+    def flush(self):
+        # The aggregated probabilities of whatever is left, e.g. at the end of a recording
+        if self._count == 0:
+            return None
+
+        probabilities = self._sum / self._count
+        self.clear()
+        return probabilities
+
+    def poll(self, timestamp):
+        if self._mode == PredictionAggregator.SLIDING:
+            while len(self._window) > 0 and timestamp - self._window[0][0] > self._window_time:
+                _, probabilities = self._window.popleft()
+                self._sum -= probabilities
+                self._count -= 1
+
+            if self._count == 0:
+                self.clear()
+
+        if self._count == 0 or timestamp - self._start_time < self._hop_time:
+            return None
+
+        probabilities = self._sum / self._count
+        if self._mode == PredictionAggregator.TUMBLING:
+            self.clear()
+        else:
+            self._start_time = timestamp
+        return probabilities
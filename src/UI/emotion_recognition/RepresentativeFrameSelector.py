@@ -0,0 +1,24 @@
+import numpy as np
+
+
+class RepresentativeFrameSelector:
+    """Keeps, for every class, the frame with the highest probability seen so far in the window.
+
+    Memory stays at one frame per class whatever the window length or frame rate.
+    """
+
+    def __init__(self, no_classes=7):
+        self._best_scores = np.zeros(no_classes, dtype=np.float32)
+        self._best_frames = [None] * no_classes
+
+    def update(self, frame, prediction):
+        for selected_class in np.flatnonzero(prediction > self._best_scores):
+            self._best_frames[selected_class] = frame
+        np.maximum(self._best_scores, prediction, out=self._best_scores)
+
+    def get_representative_frame(self, selected_class):
+        return self._best_frames[selected_class]
+
+    def clear(self):
+        self._best_scores.fill(0)
+        self._best_frames = [None] * len(self._best_frames)
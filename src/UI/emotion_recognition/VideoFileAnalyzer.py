@@ -0,0 +1,109 @@
+import time
+
+import cv2
+from imutils import face_utils
+
+from detection import create_detector
+from detection.ScaledFaceDetector import ScaledFaceDetector
+from detection.detection_utils import is_face_detected
+from inference import create_model_backend
+from emotion_recognition.FacePreprocessor import FacePreprocessor
+from emotion_recognition.FaceWindows import FaceWindows
+from reports import DataStoreManager
+from utils import Settings
+from utils.Logger import Logger
+from utils.Manager import VIDEO_MODEL_PATH
+from utils.Timer import Timer
+
+
+class VideoFileAnalyzer:
+    def __init__(self, batch_size=32):
+        self._logger = Logger()
+        # Only the video model is loaded, Manager would open the camera and load the audio model too
+        self._video_model = create_model_backend(VIDEO_MODEL_PATH, Settings.INFERENCE_BACKEND, Settings.MODEL_VARIANT)
+        self._data_store_manager = DataStoreManager()
+
+        self._batch_size = batch_size
+
+        self._shape_x = 48
+        self._shape_y = 48
+        self._classes = {0: 'Angry', 1: 'Disgust', 2: 'Fear', 3: 'Happy', 4: 'Sad', 5: 'Surprise', 6: 'Neutral'}
+
+        self._face_preprocessor = FacePreprocessor(batch_size, self._shape_x, self._shape_y)
+        self._face_detect = ScaledFaceDetector(create_detector(Settings.VIDEO_FACE_DETECTOR),
+                                               Settings.VIDEO_DETECTION_SCALE)
+
+        # [(timestamp, frame, face_index),...], the faces are kept in the preprocessor buffer
+        self._pending = []
+        # Like the live capture, faces are indexed left to right and each one has its own windows. The index is a
+        # position, not an identity, people who swap places swap their windows too
+        self._face_windows = FaceWindows(self._classes, self._data_store_manager)
+
+    def analyze(self, filename):
+        capture = cv2.VideoCapture(filename)
+        if not capture.isOpened():
+            self._logger.log_error(f"Could not open video file {filename}")
+            return None
+
+        self._pending.clear()
+        self._face_windows.clear()
+
+        no_frames = 0
+        timestamp = 0
+        timer = Timer()
+        timer.start()
+        self._data_store_manager.start_date = time.time()
+        try:
+            while True:
+                is_read, frame = capture.read()
+                if not is_read:
+                    break
+
+                no_frames += 1
+                timestamp = capture.get(cv2.CAP_PROP_POS_MSEC)
+
+                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                rects = sorted(self._face_detect(gray, 0), key=lambda rect: rect.left())
+                for face_index, rect in enumerate(rects):
+                    (x, y, width, height) = face_utils.rect_to_bb(rect)
+                    face = gray[y:y + height, x:x + width]
+                    if not is_face_detected(face):
+                        continue
+
+                    self._face_preprocessor.resize(face, len(self._pending))
+                    self._pending.append((timestamp, frame, face_index))
+
+                if len(self._pending) >= self._batch_size:
+                    self._predict_pending()
+
+            self._predict_pending()
+            self._face_windows.flush(timestamp)
+        finally:
+            capture.release()
+
+        elapsed_time = timer.record_time() / 1000
+        timer.stop()
+        self._data_store_manager.end_date = self._data_store_manager.start_date + timestamp / 1000
+
+        frames_per_second = no_frames / elapsed_time if elapsed_time > 0 else 0
+        self._logger.log_info(f"Analyzed {filename}: {no_frames} frames in {elapsed_time:.2f}s "
+                              f"({frames_per_second:.2f} frames/sec)")
+        return no_frames, elapsed_time, frames_per_second
+
+    def _predict_pending(self):
+        if len(self._pending) == 0:
+            return
+
+        faces = self._face_preprocessor.faces(len(self._pending))
+        predictions = self._video_model.predict(faces)
+
+        previous_timestamp = None
+        for (timestamp, frame, face_index), prediction in zip(self._pending, predictions):
+            if timestamp != previous_timestamp:
+                # The windows of every face are closed on the first face of a frame
+                self._face_windows.poll(timestamp)
+                previous_timestamp = timestamp
+
+            self._face_windows.add(timestamp, face_index, frame, prediction)
+
+        self._pending.clear()
@@ -0,0 +1,13 @@
+class VideoFrame:
+    def __init__(self, timestamp, frame):
+        self.timestamp = timestamp
+        self.frame = frame
+        self.gray = None
+
+        self.faces = []  # [(face_index, shape, (x, y, width, height)),...], shape holds the (68, 2) landmarks
+        self.attributes = []  # [(eye aspect ratio, has glasses),...]
+        self.predictions = None  # (len(faces), no_classes)
+        self.inference_time = 0  # ms
+
+        # Frames skipped by the rate controller are displayed with the faces of the last predicted frame
+        self.is_predicted = True
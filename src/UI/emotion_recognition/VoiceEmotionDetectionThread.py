@@ -1,6 +1,7 @@
 from PySide6.QtCore import QObject
 
 import time
+import numpy as np
 import pyaudio
 import uuid
 import os
@@ -8,8 +9,8 @@ import os
 from emotion_recognition.VoiceEmotionPredictionThread import VoiceEmotionPredictionThread
 from reports import DataStoreManager
 from utils import Manager, Logger, Settings
-from utils.Timer import Timer
-from utils.Wave import WaveUtils
+from utils.AudioRingBuffer import AudioRingBuffer
+from utils.Wave import WaveUtils, int16_to_float
 
 
 class VoiceEmotionDetectionThread(QObject):
@@ -27,8 +28,10 @@ class VoiceEmotionDetectionThread(QObject):
         self._audio_input_stream = None
         self._is_paused = False
 
-        self._frames_to_predict = []
-        self._frames = []
+        self._frames = []  # Captured int16 buffers, saved as the interview recording
+        # Holds a few hops more than a window, so predictions can lag behind the capture for a while
+        self._ring_buffer = AudioRingBuffer(
+            int((Settings.AUDIO_WINDOW_TIME + 8 * Settings.AUDIO_HOP_TIME) * self._frame_rate / 1000))
 
         self._emotion = {0: 'Angry', 1: 'Disgust', 2: 'Fear', 3: 'Happy', 4: 'Neutral', 5: 'Sad', 6: 'Surprise'}
         self._chunk_step = 16000
@@ -38,45 +41,55 @@ class VoiceEmotionDetectionThread(QObject):
         self._manager = Manager()
         self._data_store_manager = DataStoreManager()
 
-    def read_intermediate_wave(self, wave_utils):
-        path = "./temp/"
-        if not os.path.exists(path):
-            os.makedirs(path)
-        file_name = path + str(uuid.uuid4()) + '.wav'
-        wave_utils.write_wave(file_name, self._frames_to_predict[:])
-        data, _ = wave_utils.load_wave(file_name)
-        os.remove(file_name)
-        return data
+    def _on_audio(self, in_data, frame_count, time_info, status):
+        # Runs on PortAudio's callback thread, it only stores the samples
+        self._frames.append(in_data)
+        self._ring_buffer.write(np.frombuffer(in_data, dtype=np.int16))
+        return None, pyaudio.paContinue
+
+    def _samples_to_time(self, no_samples):
+        return no_samples * 1000 / self._frame_rate
 
     def work(self):
         self._is_paused = False
+        self._frames.clear()
+        self._ring_buffer.clear()
         self._audio_input_stream = self._pyAudioObject.open(
             format=pyaudio.paInt16,
             channels=self._channels,
             rate=self._frame_rate,
             input=True,
-            frames_per_buffer=self._frames_per_buffer)
+            frames_per_buffer=self._frames_per_buffer,
+            stream_callback=self._on_audio)
         self._audio_input_stream.start_stream()
 
         wave_utils = WaveUtils()
-        timer = Timer()
-        timer.start()
-        start_time = timer.record_time()
         time_format = "%Y-%m-%d %H:%M:%S"
         path = "./candidate_speech/"
         full_path = path + str(uuid.uuid4()) + ".wav"
         self._data_store_manager.audio_path = full_path
-        target_time = 4 * 1000
+
+        # Windows end on the sample clock, every hop_samples, so their timestamps match the saved recording
+        window_samples = int(round(Settings.AUDIO_WINDOW_TIME * self._frame_rate / 1000))
+        hop_samples = int(round(Settings.AUDIO_HOP_TIME * self._frame_rate / 1000))
+        window_end = window_samples
         try:
             while self._audio_input_stream.is_active():
-                data = self._audio_input_stream.read(self._frames_per_buffer)
-                self._frames.append(data)
-
-                if not Settings.AUDIO_PREDICTION:
+                if not self._ring_buffer.wait_for(window_end, timeout=0.1):
                     continue
 
-                if self._is_paused and len(self._frames_to_predict) == 0:
-                    start_time = timer.record_time()
+                total_written = self._ring_buffer.total_written
+                if total_written - window_end > self._ring_buffer.capacity - window_samples:
+                    # Fell behind by more than the ring holds, continue from the latest samples
+                    self._logger.log_warning(f"Audio prediction fell behind, skipped "
+                                             f"{self._samples_to_time(total_written - window_end):.0f} ms")
+                    window_end = total_written
+
+                window = self._ring_buffer.read(window_end, window_samples)
+                timestamp = self._samples_to_time(window_end)
+                window_end += hop_samples
+
+                if not Settings.AUDIO_PREDICTION or self._is_paused:
                     continue
 
                 latest_prediction = self.voice_prediction.get_latest_prediction()
@@ -86,20 +99,9 @@ class VoiceEmotionDetectionThread(QObject):
                     self._parent.chart.setTitle(str_prediction)
                     print(str_prediction)
 
-                self._frames_to_predict.append(data)
-                current_time = timer.record_time()
-                seconds_passed = current_time - start_time
-                seconds = timer.record_time()
-
-                if seconds_passed > target_time:
-                    data = self.read_intermediate_wave(wave_utils)
-                    self.voice_prediction.queue_data((seconds, data))
-
-                    self._frames_to_predict.clear()
-                    start_time = timer.record_time()
+                self.voice_prediction.queue_data((timestamp, int16_to_float(window)))
 
             self.voice_prediction.abort()
-            timer.stop()
 
             if not os.path.exists(path):
                 os.makedirs(path)
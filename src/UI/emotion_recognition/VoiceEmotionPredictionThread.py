@@ -1,18 +1,46 @@
 from PySide6.QtCore import QObject
 
 import numpy as np
-from scipy.stats import zscore
-import librosa
+from numpy.lib.stride_tricks import sliding_window_view
 
+from emotion_recognition.MelSpectrogramExtractor import get_mel_extractor
+from emotion_recognition.PredictionAggregator import PredictionAggregator
 from reports import DataStoreManager
-from utils import Manager
+from utils import Manager, Logger, Settings
+from utils.StageTimings import StageTimings
+import queue
 import time
 
 
+def _frame(y, win_step=64, win_size=128):
+    # (a, b, n) -> (a, frames, b, win_size) strided view of the windows, nothing is copied
+    frames = sliding_window_view(y, win_size, axis=-1)[:, :, ::win_step, :]
+    return frames.transpose(0, 2, 1, 3)
+
+
+def prepare_audio(y, chunk_step=16000, chunk_size=49100):
+    # Audio model input (chunks, 5, 128, 128, 1) of a 16kHz signal
+    chunks = _frame(y.reshape(1, 1, -1), chunk_step, chunk_size)
+    chunks = chunks.reshape(chunks.shape[1], chunks.shape[-1])
+
+    # The audio model was trained on chunks rounded to float16 and z-scored in float16. Without that rounding the
+    # log-mel features move by up to 2.4 dB, so it is kept
+    chunks = chunks.astype(np.float16)
+
+    # ZScore - normalization and MelSpectograms of every chunk at once
+    mel_spect = get_mel_extractor()(chunks)
+
+    # Time distributed Framing, copied once into the contiguous float32 input of the model
+    mel_spectogram_time_distrib = np.ascontiguousarray(_frame(mel_spect), dtype=np.float32)
+
+    return mel_spectogram_time_distrib[..., np.newaxis]
+
+
 class VoiceEmotionPredictionThread(QObject):
     def __init__(self, parent=None):
         super().__init__()
         self._parent = parent
+        self._sample_rate = 16000
         self._chunk_step = 16000
         self._chunk_size = 49100
 
@@ -21,85 +49,73 @@ class VoiceEmotionPredictionThread(QObject):
 
         self._emotion = {0: 'Angry', 1: 'Disgust', 2: 'Fear', 3: 'Happy', 4: 'Neutral', 5: 'Sad', 6: 'Surprise'}
         self._is_running = False
-
-        self._data_to_predict_list = []  # [(timestamp, y),...]
+        self._aggregator = PredictionAggregator(mode=Settings.AUDIO_AGGREGATION_MODE,
+                                                window_time=Settings.AUDIO_AGGREGATION_WINDOW,
+                                                hop_time=Settings.AUDIO_AGGREGATION_HOP,
+                                                smoothing=Settings.AUDIO_AGGREGATION_SMOOTHING,
+                                                no_classes=len(self._emotion))
+
+        self._data_to_predict = queue.Queue()  # [(queued time, (timestamp, y)),...]
+        self._max_queue_depth = 0
+        self._stage_timings = StageTimings()
+        self._logger = Logger()
         self._predictions = []
 
-    def _frame(self, y, win_step=64, win_size=128):
-        # Number of frames
-        nb_frames = 1 + int((y.shape[2] - win_size) / win_step)
-
-        # Framing
-        frames = np.zeros((y.shape[0], nb_frames, y.shape[1], win_size)).astype(np.float16)
-        for t in range(nb_frames):
-            frames[:, t, :, :] = np.copy(y[:, :, (t * win_step):(t * win_step + win_size)]).astype(np.float16)
-
-        return frames
-
-    def _mel_spectrogram(self, y, sr=16000, n_fft=512, win_length=256, hop_length=128, window='hamming', n_mels=128,
-                        fmax=4000):
-
-        # Compute spectogram
-        mel_spect = np.abs(
-            librosa.stft(y, n_fft=n_fft, window=window, win_length=win_length, hop_length=hop_length)) ** 2
-
-        # Compute mel spectrogram
-        mel_spect = librosa.feature.melspectrogram(S=mel_spect, sr=sr, n_mels=n_mels, fmax=fmax)
-
-        # Compute log-mel spectrogram (Convert a power spectrogram (amplitude squared) to decibel (dB) units)
-        mel_spect = librosa.power_to_db(mel_spect, ref=np.max)
-
-        return np.asarray(mel_spect)
-
     def _predict_audio(self, y):
         if y is None or len(y) < self._chunk_size:
             return None
 
-        # preprocess
-        chunks = self._frame(y.reshape(1, 1, -1), self._chunk_step, self._chunk_size)
-        chunks = chunks.reshape(chunks.shape[1], chunks.shape[-1])
-
-        # ZScore - normalization
-        y = np.asarray(list(map(zscore, chunks)))
-
-        # MelSpectograms
-        mel_spect = np.asarray(list(map(self._mel_spectrogram, y)))
-
-        # Time distributed Framing
-        mel_spectogram_time_distrib = self._frame(mel_spect)
-
-        # predict
-        x = mel_spectogram_time_distrib.reshape(mel_spectogram_time_distrib.shape[0],
-                                                mel_spectogram_time_distrib.shape[1],
-                                                mel_spectogram_time_distrib.shape[2],
-                                                mel_spectogram_time_distrib.shape[3],
-                                                1)
-        predict = self._manager.audio_model.predict(x)
-        predict = np.argmax(predict, axis=1)
-        predict = [self._emotion.get(emotion) for emotion in predict]
-        return predict
+        x = prepare_audio(y, self._chunk_step, self._chunk_size)
+        return self._manager.audio_model.predict(x)
 
     def work(self):
         self._is_running = True
-        while self._is_running or len(self._data_to_predict_list) > 0:
-            if self._is_running:
-                time.sleep(1)
-
-            if len(self._data_to_predict_list) == 0:
+        self._aggregator.clear()
+        self._stage_timings.clear()
+        self._max_queue_depth = 0
+        while self._is_running or not self._data_to_predict.empty():
+            try:
+                queued_time, (timestamp, data) = self._data_to_predict.get(timeout=0.1)
+            except queue.Empty:
                 continue
 
-            timestamp, data = self._data_to_predict_list.pop(0)
+            start = time.perf_counter()
+            self._stage_timings.record('queue_wait', (start - queued_time) * 1000)
             if data is None or len(data) == 0:
                 continue
 
             predictions = self._predict_audio(data)
-            if predictions is not None:
-                prediction = predictions[0]
+            if predictions is None:
+                continue
+            self._stage_timings.record('predict', (time.perf_counter() - start) * 1000)
+
+            # Everything is timed by where it ends: the audio window ends at timestamp and every chunk ends
+            # chunk_step samples after the previous one
+            window_start = timestamp - len(data) * 1000 / self._sample_rate
+            for index, chunk_predictions in enumerate(predictions):
+                chunk_end = window_start + (index * self._chunk_step + self._chunk_size) * 1000 / self._sample_rate
+                self._aggregator.add(chunk_end, chunk_predictions)
+            # The next window ends a hop later, so an aggregation window due by then has all of its predictions
+            probabilities = self._aggregator.poll(timestamp + Settings.AUDIO_HOP_TIME)
+            if probabilities is not None:
+                prediction = self._emotion.get(int(np.argmax(probabilities)))
                 self._predictions.append(prediction)
                 self._data_store_manager.insert_audio((timestamp, (data, prediction)))
 
+        # Waits close to the hop time mean audio inference does not keep up with the capture
+        self._stage_timings.log(self._logger, "Audio prediction timings")
+        self._logger.log_info(f"Audio prediction queue held at most {self._max_queue_depth} windows")
+
     def queue_data(self, data):
-        self._data_to_predict_list.append(data)
+        self._data_to_predict.put((time.perf_counter(), data))
+        queue_depth = self._data_to_predict.qsize()
+        if queue_depth > self._max_queue_depth:
+            self._max_queue_depth = queue_depth
+            if queue_depth > 1:
+                self._logger.log_warning(f"Audio prediction is falling behind, {queue_depth} windows are queued")
+
+    def get_queue_depth(self):
+        return self._data_to_predict.qsize()
 
     def abort(self):
         self._is_running = False
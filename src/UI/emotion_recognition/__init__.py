@@ -1,2 +1,13 @@
-from .FaceDetectionThread import FaceDetectionThread
-from .VoiceEmotionDetectionThread import VoiceEmotionDetectionThread
+# The Qt threads are imported on first use, so the modules that do not need PySide6 and pyaudio, e.g.
+# VideoFileAnalyzer, can be imported without them
+def __getattr__(name):
+    if name == 'FaceDetectionThread':
+        from .FaceDetectionThread import FaceDetectionThread as thread_class
+    elif name == 'VoiceEmotionDetectionThread':
+        from .VoiceEmotionDetectionThread import VoiceEmotionDetectionThread as thread_class
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    # Replaces the submodule the import bound to the same name
+    globals()[name] = thread_class
+    return thread_class
@@ -0,0 +1,10 @@
+from abc import ABC, abstractmethod
+
+
+class InferenceBackend(ABC):
+    def __init__(self, model_path):
+        self.model_path = model_path
+
+    @abstractmethod
+    def predict(self, x):
+        pass
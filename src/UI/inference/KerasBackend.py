@@ -0,0 +1,12 @@
+from tensorflow.keras.models import load_model
+
+from inference.InferenceBackend import InferenceBackend
+
+
+class KerasBackend(InferenceBackend):
+    def __init__(self, model_path):
+        super().__init__(model_path)
+        self._model = load_model(model_path, compile=False)
+
+    def predict(self, x):
+        return self._model.predict(x)
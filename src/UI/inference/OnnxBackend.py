@@ -0,0 +1,21 @@
+import os
+
+import numpy as np
+import onnxruntime
+
+from inference.InferenceBackend import InferenceBackend
+
+
+class OnnxBackend(InferenceBackend):
+    def __init__(self, model_path):
+        onnx_path = os.path.splitext(model_path)[0] + '.onnx'
+        if not os.path.exists(onnx_path):
+            raise FileNotFoundError(f"{onnx_path} not found, convert {model_path} first with: "
+                                    f"python -m tf2onnx.convert --keras {model_path} --output {onnx_path}")
+
+        super().__init__(onnx_path)
+        self._session = onnxruntime.InferenceSession(onnx_path, providers=['CPUExecutionProvider'])
+        self._input_name = self._session.get_inputs()[0].name
+
+    def predict(self, x):
+        return self._session.run(None, {self._input_name: np.asarray(x, dtype=np.float32)})[0]
@@ -0,0 +1,43 @@
+import os
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.models import load_model
+
+from inference.InferenceBackend import InferenceBackend
+
+
+def convert_to_tflite(model_path):
+    converter = tf.lite.TFLiteConverter.from_keras_model(load_model(model_path, compile=False))
+    # The LSTM of the audio model needs TensorFlow ops that have no TFLite builtin
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS, tf.lite.OpsSet.SELECT_TF_OPS]
+    return converter.convert()
+
+
+class TfLiteBackend(InferenceBackend):
+    def __init__(self, model_path):
+        super().__init__(model_path)
+        if model_path.endswith('.tflite'):
+            self._interpreter = tf.lite.Interpreter(model_path=model_path)
+        else:
+            tflite_path = os.path.splitext(model_path)[0] + '.tflite'
+            if os.path.exists(tflite_path):
+                self._interpreter = tf.lite.Interpreter(model_path=tflite_path)
+            else:
+                self._interpreter = tf.lite.Interpreter(model_content=convert_to_tflite(model_path))
+
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+        self._input_shape = tuple(self._input['shape'])
+        self._interpreter.allocate_tensors()
+
+    def predict(self, x):
+        x = np.asarray(x, dtype=self._input['dtype'])
+        if self._input_shape != x.shape:
+            self._interpreter.resize_tensor_input(self._input['index'], x.shape)
+            self._interpreter.allocate_tensors()
+            self._input_shape = x.shape
+
+        self._interpreter.set_tensor(self._input['index'], x)
+        self._interpreter.invoke()
+        return self._interpreter.get_tensor(self._output['index']).copy()
@@ -0,0 +1,2 @@
+from .InferenceBackend import InferenceBackend
+from .inference_utils import create_backend, create_model_backend
@@ -0,0 +1,42 @@
+import os
+
+KERAS = 'keras'
+TF_FUNCTION = 'tf_function'
+ONNX = 'onnx'
+TFLITE = 'tflite'
+
+BACKENDS = [KERAS, TF_FUNCTION, ONNX, TFLITE]
+
+DYNAMIC_RANGE = 'dynamic'
+INT8 = 'int8'
+
+VARIANTS = [DYNAMIC_RANGE, INT8]
+
+
+def quantized_model_path(model_path, variant):
+    return f"{os.path.splitext(model_path)[0]}_{variant}.tflite"
+
+
+def create_backend(name, model_path):
+    # Backends are imported lazily, onnxruntime only has to be installed when it is used
+    if name == KERAS:
+        from inference.KerasBackend import KerasBackend
+        return KerasBackend(model_path)
+    if name == TF_FUNCTION:
+        from inference.TfFunctionBackend import TfFunctionBackend
+        return TfFunctionBackend(model_path)
+    if name == ONNX:
+        from inference.OnnxBackend import OnnxBackend
+        return OnnxBackend(model_path)
+    if name == TFLITE:
+        from inference.TfLiteBackend import TfLiteBackend
+        return TfLiteBackend(model_path)
+
+    raise ValueError(f"Unknown inference backend {name}, expected one of {BACKENDS}")
+
+
+def create_model_backend(model_path, backend_name, variant=''):
+    # Quantized variants are TFLite models written by quantize_models.py
+    if variant:
+        return create_backend(TFLITE, quantized_model_path(model_path, variant))
+    return create_backend(backend_name, model_path)
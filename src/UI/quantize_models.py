@@ -0,0 +1,174 @@
+import argparse
+import glob
+import os
+import time
+
+import cv2
+import dlib
+import librosa
+import numpy as np
+import tensorflow as tf
+from imutils import face_utils
+from tensorflow.keras.models import load_model
+
+from emotion_recognition.FacePreprocessor import FacePreprocessor
+from emotion_recognition.VoiceEmotionPredictionThread import prepare_audio
+from inference import create_backend
+from inference.inference_utils import KERAS, TFLITE, INT8, VARIANTS, quantized_model_path
+
+VIDEO_MODEL = 'Models/video.h5'
+AUDIO_MODEL = 'Models/audio_v2.hdf5'
+
+VIDEO_CLASSES = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
+AUDIO_CLASSES = ['angry', 'disgust', 'fear', 'happy', 'neutral', 'sad', 'surprise']
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def label_from_filename(filename, classes):
+    # Sample files named after their emotion (angry.wav, fear2.wav,...) are used to measure accuracy
+    name = os.path.basename(filename).lower()
+    for index, emotion in enumerate(classes):
+        if name.startswith(emotion):
+            return index
+    return -1
+
+
+def load_video_samples(paths, max_frames_per_file=200):
+    detector = dlib.get_frontal_face_detector()
+    preprocessor = FacePreprocessor()
+    samples = []
+    labels = []
+    for path in paths:
+        if path.lower().endswith(IMAGE_EXTENSIONS):
+            frames = [cv2.imread(path)]
+        else:
+            capture = cv2.VideoCapture(path)
+            frames = []
+            while len(frames) < max_frames_per_file:
+                is_read, frame = capture.read()
+                if not is_read:
+                    break
+                frames.append(frame)
+            capture.release()
+
+        for frame in frames:
+            if frame is None:
+                continue
+
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            for rect in detector(gray, 0):
+                (x, y, width, height) = face_utils.rect_to_bb(rect)
+                if x < 0 or y < 0 or width <= 0 or height <= 0:
+                    continue
+                samples.append(preprocessor.preprocess(gray, [(x, y, width, height)]).copy())
+                labels.append(label_from_filename(path, VIDEO_CLASSES))
+
+    if len(samples) == 0:
+        return None, None
+    return np.concatenate(samples), np.array(labels)
+
+
+def load_audio_samples(paths, chunk_step=16000, chunk_size=49100):
+    samples = []
+    labels = []
+    for path in paths:
+        y, _ = librosa.core.load(path, sr=16000)
+        if len(y) < chunk_size:
+            continue
+
+        x = prepare_audio(y, chunk_step, chunk_size).astype(np.float32)
+        samples.append(x)
+        labels.extend([label_from_filename(path, AUDIO_CLASSES)] * len(x))
+
+    if len(samples) == 0:
+        return None, None
+    return np.concatenate(samples), np.array(labels)
+
+
+def quantize(model_path, variant, calibration_samples):
+    converter = tf.lite.TFLiteConverter.from_keras_model(load_model(model_path, compile=False))
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    # Ops without an int8 kernel (the LSTM of the audio model) fall back to float or TensorFlow ops
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS, tf.lite.OpsSet.SELECT_TF_OPS]
+
+    if variant == INT8:
+        def representative_dataset():
+            for sample in calibration_samples:
+                yield [sample[np.newaxis].astype(np.float32)]
+
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8] + \
+            converter.target_spec.supported_ops
+
+    output_path = quantized_model_path(model_path, variant)
+    with open(output_path, 'wb') as output_file:
+        output_file.write(converter.convert())
+    return output_path
+
+
+def evaluate(backend, samples, repeat=50):
+    predictions = np.concatenate([backend.predict(sample[np.newaxis]) for sample in samples])
+
+    timings = []
+    for index in range(repeat):
+        sample = samples[index % len(samples)][np.newaxis]
+        start = time.perf_counter()
+        backend.predict(sample)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return predictions, np.mean(timings)
+
+
+def accuracy(predictions, labels):
+    labeled = labels >= 0
+    if not labeled.any():
+        return None
+    return (np.argmax(predictions[labeled], axis=1) == labels[labeled]).mean()
+
+
+def report(model_path, samples, labels, variants):
+    original, original_latency = evaluate(create_backend(KERAS, model_path), samples)
+    original_accuracy = accuracy(original, labels)
+    original_size = os.path.getsize(model_path) / 2 ** 20
+
+    print(f"{model_path}: {len(samples)} calibration samples")
+    print(f"  {'original':10} {original_size:7.2f} MB {original_latency:8.2f} ms"
+          + (f"  accuracy {original_accuracy:.2%}" if original_accuracy is not None else ""))
+
+    for variant in variants:
+        output_path = quantize(model_path, variant, samples)
+        quantized, latency = evaluate(create_backend(TFLITE, output_path), samples)
+        quantized_accuracy = accuracy(quantized, labels)
+        agreement = (np.argmax(quantized, axis=1) == np.argmax(original, axis=1)).mean()
+        size = os.path.getsize(output_path) / 2 ** 20
+
+        line = f"  {variant:10} {size:7.2f} MB {latency:8.2f} ms  top-1 agreement {agreement:.2%}, " \
+               f"max probability difference {np.abs(quantized - original).max():.3f}"
+        if quantized_accuracy is not None:
+            line += f", accuracy delta {quantized_accuracy - original_accuracy:+.2%}"
+        print(line + f" -> {output_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Writes quantized TFLite variants of the video and audio models")
+    parser.add_argument('--variants', type=str, nargs='+', default=VARIANTS, choices=VARIANTS)
+    parser.add_argument('--audio-samples', type=str, default='../../Tests/Speech/Python/Sounds',
+                        help="Directory of 16kHz wav files used for calibration")
+    parser.add_argument('--video-samples', type=str, nargs='*', default=[],
+                        help="Videos or images with faces used for calibration")
+    args = parser.parse_args()
+
+    audio_samples, audio_labels = load_audio_samples(sorted(glob.glob(os.path.join(args.audio_samples, '*.wav'))))
+    if audio_samples is None:
+        print(f"No audio samples in {args.audio_samples}, skipping {AUDIO_MODEL}")
+    else:
+        report(AUDIO_MODEL, audio_samples, audio_labels, args.variants)
+
+    video_samples, video_labels = load_video_samples(args.video_samples)
+    if video_samples is None:
+        print(f"No faces found in --video-samples, skipping {VIDEO_MODEL}")
+    else:
+        report(VIDEO_MODEL, video_samples, video_labels, args.variants)
+
+    print(f"Set Settings.MODEL_VARIANT to one of {args.variants} to run the quantized models")
@@ -12,6 +12,7 @@ class DataStoreManager(metaclass=Singleton):
         self.audio_predictions = {}  # {Timestamp, ([Frame], Prediction)} ?
 
         self.video_predictions = {}  # {Timestamp, (Frame, Prediction)} ? Timestamp = time.time()
+        self.face_video_predictions = {}  # {Face index, {Timestamp, (Frame, Prediction)}}
 
         self.start_date = -1
         self.end_date = -1
@@ -22,8 +23,13 @@ class DataStoreManager(metaclass=Singleton):
     def insert_audio(self, data):
         self.audio_predictions[data[0]] = data[1]
 
-    def insert_video(self, data):
-        self.video_predictions[data[0]] = data[1]
+    def insert_video(self, data, face_index=0):
+        # The first face (left most) is the main video prediction stream. face_index is only the left to right
+        # position of a face in its frame, not an identity: when people swap places or one leaves the frame, the
+        # predictions of a person go on under another index
+        if face_index == 0:
+            self.video_predictions[data[0]] = data[1]
+        self.face_video_predictions.setdefault(face_index, {})[data[0]] = data[1]
 
     def insert_text(self, data):
         self.text[data[0]] = data[1]
@@ -7,6 +7,7 @@ class ReportPredictions:
         self.audio_predictions = {}  # {Timestamp, ([Frame], Prediction)}
 
         self.video_predictions = {}  # {Timestamp, (Frame, Prediction)}
+        self.face_video_predictions = {}  # {Face index, {Timestamp, (Frame, Prediction)}}
 
     def initialize(self, data_store_manager):
         self.text = data_store_manager.text
@@ -17,6 +18,7 @@ class ReportPredictions:
         self.audio_predictions = data_store_manager.audio_predictions
 
         self.video_predictions = data_store_manager.video_predictions
+        self.face_video_predictions = data_store_manager.face_video_predictions
 
     def from_dict(self, prediction_dict):
         for key in prediction_dict:
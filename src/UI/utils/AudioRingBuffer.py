@@ -0,0 +1,57 @@
+import threading
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """Preallocated ring of the latest capacity samples, written by the audio callback and read by window.
+
+    Samples are addressed by their absolute index since the capture started, so a window read back is aligned to
+    the exact samples it was asked for.
+    """
+
+    def __init__(self, capacity, dtype=np.int16):
+        self._buffer = np.zeros(capacity, dtype=dtype)
+        self._capacity = capacity
+        self._total_written = 0
+        self._written = threading.Condition()
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @property
+    def total_written(self):
+        with self._written:
+            return self._total_written
+
+    def clear(self):
+        with self._written:
+            self._total_written = 0
+
+    def write(self, samples):
+        # Only the last capacity samples of a longer write are kept
+        no_samples = len(samples)
+        samples = samples[-self._capacity:]
+        with self._written:
+            start = (self._total_written + no_samples - len(samples)) % self._capacity
+            first_part = min(len(samples), self._capacity - start)
+            self._buffer[start:start + first_part] = samples[:first_part]
+            self._buffer[:len(samples) - first_part] = samples[first_part:]
+            self._total_written += no_samples
+            self._written.notify_all()
+
+    def wait_for(self, sample_index, timeout=None):
+        # True once the samples up to sample_index were written
+        with self._written:
+            return self._written.wait_for(lambda: self._total_written >= sample_index, timeout)
+
+    def read(self, end, length):
+        """Copy of the length samples before the absolute sample index end, None if they were overwritten."""
+        with self._written:
+            start = end - length
+            if start < 0 or end > self._total_written or start < self._total_written - self._capacity:
+                return None
+
+            indexes = np.arange(start, end) % self._capacity
+            return self._buffer[indexes]
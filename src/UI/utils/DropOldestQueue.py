@@ -0,0 +1,39 @@
+import threading
+from collections import deque
+
+
+class DropOldestQueue:
+    """Bounded, thread safe queue where putting into a full queue drops the oldest item instead of blocking."""
+
+    def __init__(self, capacity=2):
+        self._items = deque(maxlen=capacity)
+        self._not_empty = threading.Condition()
+        self._dropped_items = 0
+
+    @property
+    def dropped_items(self):
+        return self._dropped_items
+
+    def qsize(self):
+        with self._not_empty:
+            return len(self._items)
+
+    def put(self, item):
+        with self._not_empty:
+            if len(self._items) == self._items.maxlen:
+                self._dropped_items += 1
+            self._items.append(item)
+            self._not_empty.notify()
+
+    def get(self, timeout=None):
+        with self._not_empty:
+            if len(self._items) == 0:
+                self._not_empty.wait(timeout)
+            if len(self._items) == 0:
+                return None
+            return self._items.popleft()
+
+    def clear(self):
+        with self._not_empty:
+            self._items.clear()
+            self._dropped_items = 0
@@ -0,0 +1,36 @@
+import threading
+from collections import deque
+
+
+class FrameMailbox:
+    """Thread safe, bounded hand-off of frames where only the newest frames are kept."""
+
+    def __init__(self, capacity=1):
+        self._frames = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._dropped_frames = 0
+
+    @property
+    def dropped_frames(self):
+        return self._dropped_frames
+
+    def put(self, frame):
+        with self._lock:
+            if len(self._frames) == self._frames.maxlen:
+                self._dropped_frames += 1
+            self._frames.append(frame)
+
+    def get_latest(self):
+        with self._lock:
+            if len(self._frames) == 0:
+                return None
+
+            frame = self._frames.pop()
+            self._dropped_frames += len(self._frames)
+            self._frames.clear()
+            return frame
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self._dropped_frames = 0
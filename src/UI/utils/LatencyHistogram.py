@@ -0,0 +1,65 @@
+import math
+
+import numpy as np
+
+
+class LatencyHistogram:
+    """Counts of durations in log spaced bins, so recording is O(1) and percentiles are accurate to a bin width.
+
+    With the default 40 bins per decade a percentile is within 6% of the recorded value, between min_time and
+    max_time milliseconds. Durations outside that range are counted in the first or last bin.
+    """
+
+    def __init__(self, min_time=0.01, max_time=10 * 1000, bins_per_decade=40):
+        self._min_time = min_time
+        self._bins_per_decade = bins_per_decade
+        self._no_bins = int(math.ceil(math.log10(max_time / min_time) * bins_per_decade)) + 1
+        self._counts = [0] * self._no_bins
+        self._count = 0
+        self._total_time = 0.0
+        self._max_time = 0.0
+
+    @property
+    def count(self):
+        return self._count
+
+    def clear(self):
+        self._counts = [0] * self._no_bins
+        self._count = 0
+        self._total_time = 0.0
+        self._max_time = 0.0
+
+    def record(self, elapsed_time):
+        if elapsed_time <= self._min_time:
+            index = 0
+        else:
+            index = min(int(math.log10(elapsed_time / self._min_time) * self._bins_per_decade) + 1, self._no_bins - 1)
+        self._counts[index] += 1
+        self._count += 1
+        self._total_time += elapsed_time
+        if elapsed_time > self._max_time:
+            self._max_time = elapsed_time
+
+    def percentiles(self, percents):
+        if self._count == 0:
+            return [0.0] * len(percents)
+
+        cumulative_counts = np.cumsum(self._counts)
+        values = []
+        for percent in percents:
+            index = int(np.searchsorted(cumulative_counts, percent / 100 * self._count))
+            # The upper edge of the bin, never above the longest duration actually recorded
+            upper_edge = self._min_time * 10 ** (index / self._bins_per_decade)
+            values.append(min(upper_edge, self._max_time))
+        return values
+
+    def summary(self):
+        p50, p95, p99 = self.percentiles((50, 95, 99))
+        return {
+            'count': self._count,
+            'mean': self._total_time / self._count if self._count > 0 else 0.0,
+            'p50': p50,
+            'p95': p95,
+            'p99': p99,
+            'max': self._max_time
+        }
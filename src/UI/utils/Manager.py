@@ -2,22 +2,29 @@ import cv2
 import dlib
 import numpy as np
 
-from tensorflow.keras.models import load_model
+from inference import create_model_backend
+from utils.Settings import Settings
 from utils.Singleton import Singleton
 
+VIDEO_MODEL_PATH = 'Models/video.h5'
+AUDIO_MODEL_PATH = 'Models/audio_v2.hdf5'
+LANDMARKS_MODEL_PATH = 'Models/face_landmarks.dat'
+
 
 class Manager(metaclass=Singleton):
     def __init__(self):
         self.app = None
         self.window = None
 
-        self.video_model = load_model('Models/video.h5', compile=False)
-        self.video_predictor_landmarks = dlib.shape_predictor("Models/face_landmarks.dat")
+        self.video_model = create_model_backend(VIDEO_MODEL_PATH, Settings.INFERENCE_BACKEND,
+                                                Settings.MODEL_VARIANT)
+        self.video_predictor_landmarks = dlib.shape_predictor(LANDMARKS_MODEL_PATH)
         self.active_camera = cv2.VideoCapture(0)
 
         self.lightTheme = False
 
-        self.audio_model = load_model('Models/audio_v2.hdf5', compile=False)
+        self.audio_model = create_model_backend(AUDIO_MODEL_PATH, Settings.INFERENCE_BACKEND,
+                                                Settings.MODEL_VARIANT)
         self.prepare_manager()
 
     def prepare_manager(self):
@@ -13,6 +13,51 @@ class Settings:
     TEXT_PREDICTION = True
     MICROPHONE_INDEX_AND_NAME = (-1, "Default")
 
+    # INFERENCE SETTINGS
+    # ///////////////////////////////////////////////////////////////
+    INFERENCE_BACKEND = 'keras'  # 'keras', 'tf_function', 'onnx' or 'tflite' (see inference.create_backend)
+    MODEL_VARIANT = ''  # '' for the original models, 'dynamic' or 'int8' for the ones written by quantize_models.py
+
+    # VIDEO PIPELINE SETTINGS
+    # ///////////////////////////////////////////////////////////////
+    VIDEO_FACE_DETECTOR = 'hog'  # 'hog', 'haar', 'ssd' or 'yunet' (see detection.create_detector)
+    VIDEO_DETECTION_SCALE = 1.0  # the face detector runs on a frame resized by this factor
+    VIDEO_FACE_TRACKING = True
+    VIDEO_DETECTION_PROCESSES = 0  # worker processes detecting faces, without tracking; 0 detects on a thread
+    VIDEO_MIN_REDETECT_INTERVAL = 2  # frames
+    VIDEO_MAX_REDETECT_INTERVAL = 15  # frames
+    VIDEO_TRACKING_MIN_QUALITY = 7.0  # dlib correlation tracker peak to side lobe ratio
+    VIDEO_INFERENCE_BATCH_SIZE = 8  # faces per video model call
+    VIDEO_INFERENCE_MAX_DELAY = 0.02  # seconds a face waits for the batch to fill up
+    VIDEO_INFERENCE_QUEUE_SIZE = 8  # frames waiting for prediction, the oldest one is dropped when full
+    VIDEO_ATTRIBUTES_INTERVAL = 10  # frames between two eye state / glasses updates of a face
+    VIDEO_ATTRIBUTES_SMOOTHING = 0.5  # weight of the newest eye state / glasses value
+    VIDEO_ADAPTIVE_RATE = True  # predict only as many frames as fit VIDEO_CPU_BUDGET
+    VIDEO_TARGET_FPS = 30
+    VIDEO_CPU_BUDGET = 0.5  # share of a frame interval that detection and inference of one frame may take
+    VIDEO_MAX_PREDICTION_INTERVAL = 10  # predict at least every n-th frame
+    VIDEO_PREDICTION_SMOOTHING = 0.3  # ema weight of the newest prediction in the displayed labels
+    VIDEO_OVERLAYS = True  # draw landmarks and predictions on the displayed frame
+    VIDEO_STAGE_TIMINGS = True  # per stage latency histograms, logged when the capture stops
+    VIDEO_STAGE_TIMINGS_FILE = ''  # json file the stage timings are also written to, if set
+    VIDEO_STAGE_QUEUE_SIZE = 2  # frames waiting between two pipeline stages, the oldest one is dropped when full
+
+    # PREDICTION AGGREGATION SETTINGS
+    # modes: 'tumbling', 'sliding' or 'ema' (see PredictionAggregator), times in milliseconds
+    # ///////////////////////////////////////////////////////////////
+    VIDEO_AGGREGATION_MODE = 'tumbling'
+    VIDEO_AGGREGATION_WINDOW = 4 * 1000
+    VIDEO_AGGREGATION_HOP = 4 * 1000
+    VIDEO_AGGREGATION_SMOOTHING = 0.3  # ema weight of the newest prediction
+
+    AUDIO_WINDOW_TIME = 3070  # length of audio sent to the model, it takes 49100 samples at 16kHz
+    AUDIO_HOP_TIME = 1000  # time between the ends of two consecutive audio windows
+    AUDIO_AGGREGATION_MODE = 'tumbling'
+    # one prediction per audio window, stored with the timestamp and samples of that window
+    AUDIO_AGGREGATION_WINDOW = AUDIO_HOP_TIME
+    AUDIO_AGGREGATION_HOP = AUDIO_HOP_TIME
+    AUDIO_AGGREGATION_SMOOTHING = 0.5
+
     DESCRIPTION = \
         "Multimodal Emotion Detection helps thorough the process of interview to investigate the emotions of " \
         "of the candidate.\n" \
@@ -0,0 +1,50 @@
+import json
+import threading
+
+from utils.LatencyHistogram import LatencyHistogram
+
+
+class StageTimings:
+    """A LatencyHistogram per pipeline stage, in milliseconds.
+
+    Each stage is expected to be recorded from a single thread, so recording takes no lock.
+    """
+
+    def __init__(self, enabled=True):
+        self._enabled = enabled
+        self._histograms = {}  # {Stage name, LatencyHistogram}
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def record(self, stage, elapsed_time):
+        if not self._enabled:
+            return
+
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(stage, LatencyHistogram())
+        histogram.record(elapsed_time)
+
+    def summary(self):
+        with self._lock:
+            return {stage: histogram.summary() for stage, histogram in self._histograms.items()}
+
+    def log(self, logger, title="Stage timings"):
+        summary = self.summary()
+        if len(summary) == 0:
+            return
+
+        lines = [f"{title} (ms):"]
+        for stage, timings in summary.items():
+            lines.append(f"  {stage:14} n={timings['count']:<7} mean {timings['mean']:8.3f}  "
+                         f"p50 {timings['p50']:8.3f}  p95 {timings['p95']:8.3f}  p99 {timings['p99']:8.3f}  "
+                         f"max {timings['max']:8.3f}")
+        logger.log_info("\n".join(lines))
+
+    def dump(self, path):
+        with open(path, 'w') as output_file:
+            json.dump(self.summary(), output_file, indent=4)
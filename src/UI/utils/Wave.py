@@ -1,6 +1,14 @@
 import io
 import wave
 import librosa
+import numpy as np
+
+
+def int16_to_float(samples):
+    # int16 samples -> float32 samples in [-1, 1), scaled like librosa scales 16 bit files
+    y = samples.astype(np.float32)
+    y *= 1 / 32768
+    return y
 
 
 class WaveUtils:
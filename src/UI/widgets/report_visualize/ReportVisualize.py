@@ -20,6 +20,7 @@ import librosa
 import librosa.display
 from PIL import Image, ImageQt
 
+from emotion_recognition.MelSpectrogramExtractor import get_mel_extractor
 from utils.SyntaxHighlighter import SyntaxHighlighter
 
 
@@ -231,13 +232,8 @@ class ReportVisualize(QWidget):
         self._video_label.setPixmap(pm)
 
     def _display_audio_plot(self, audio_frames):
-        mel_spect = np.abs(librosa.stft(audio_frames, n_fft=512, window='hamming', win_length=256, hop_length=128)) ** 2
-
-        # Compute mel spectrogram
-        mel_spect = librosa.feature.melspectrogram(S=mel_spect, sr=16000, n_mels=128, fmax=4000)
-
-        # Compute log-mel spectrogram (Convert a power spectrogram (amplitude squared) to decibel (dB) units)
-        mel_spect = librosa.power_to_db(mel_spect, ref=np.max)
+        # Log-mel spectrogram (dB), with the filterbank and window cached by the prediction's extractor
+        mel_spect = get_mel_extractor().mel_spectrogram(audio_frames)
 
         dpi = 96
         x_pixels = 650